@@ -0,0 +1,258 @@
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+# -------------------------
+# Konfigurasi backup
+# -------------------------
+BACKUP_DIR = os.environ.get("BEASISWA_BACKUP_DIR", "backups")
+BACKUP_KEEP = int(os.environ.get("BEASISWA_BACKUP_KEEP", "5"))
+BACKUP_PAGES_PER_STEP = 1024  # backup bertahap agar lock tidak ditahan selama proses
+
+_BACKUP_NAME = re.compile(r'^beasiswa-(\d{8}-\d{6}-\d{6})(?:-([a-z0-9-]+))?\.db$')
+_TABLE_PREFIX = "beasiswa_snap_"
+
+
+def _timestamp():
+    return datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+
+
+def _is_table_snapshot(name):
+    return name.startswith(_TABLE_PREFIX) or name == "beasiswa_snapshot_log"
+
+
+# -------------------------
+# Salinan database tanpa snapshot tabel
+# -------------------------
+def _schema(conn, db="main"):
+    return conn.execute(f"""
+        SELECT type, name, tbl_name, sql FROM {db}.sqlite_master
+        WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+    """).fetchall()
+
+
+def _copy_objects(conn, sumber, schema):
+    # Tabel, index, view dan trigger dibuat ulang di main lalu diisi dari database ATTACH `sumber`
+    for jenis in ("table", "index", "view", "trigger"):
+        for tipe, name, tbl, sql in schema:
+            if tipe != jenis or _is_table_snapshot(tbl):
+                continue
+            conn.execute(sql)
+            if tipe == "table":
+                conn.execute(f'INSERT INTO main."{name}" SELECT * FROM {sumber}."{name}"')
+
+
+def copy_database(conn, dest_path):
+    # Snapshot tabel hasil reset hanya disimpan di database utama; backup file dan snapshot replika
+    # tidak ikut membawa salinan katalog lama tersebut
+    schema = _schema(conn)
+    src_path = conn.execute("PRAGMA database_list").fetchone()[2]
+    dest = sqlite3.connect(dest_path, isolation_level=None)
+    try:
+        if not src_path or not any(_is_table_snapshot(tbl) for _, _, tbl, _ in schema):
+            conn.backup(dest, pages=BACKUP_PAGES_PER_STEP)
+            return
+        dest.execute("ATTACH DATABASE ? AS src", (src_path,))
+        # Satu transaksi: semua tabel dibaca dari kondisi sumber yang sama
+        dest.execute("BEGIN")
+        _copy_objects(dest, "src", schema)
+        dest.execute("COMMIT")
+        dest.execute("DETACH DATABASE src")
+    finally:
+        dest.close()
+
+
+# -------------------------
+# Backup file dengan SQLite online backup API
+# -------------------------
+def create_backup(conn, backup_dir=BACKUP_DIR, label="", keep=BACKUP_KEEP):
+    os.makedirs(backup_dir, exist_ok=True)
+    label = re.sub(r'[^a-z0-9-]+', '-', label.lower()).strip('-')
+    nama = f"beasiswa-{_timestamp()}{'-' + label if label else ''}.db"
+    tmp_path = os.path.join(backup_dir, f".{nama}.tmp")
+    path = os.path.join(backup_dir, nama)
+
+    mulai = time.perf_counter()
+    copy_database(conn, tmp_path)
+    os.replace(tmp_path, path)
+    info = {
+        'name': nama,
+        'label': label,
+        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'size': os.path.getsize(path),
+        'duration': time.perf_counter() - mulai,
+    }
+    with open(path + ".json", "w") as f:
+        json.dump(info, f)
+
+    if keep is not None:
+        prune_backups(backup_dir, keep)
+    return info
+
+
+def list_backups(backup_dir=BACKUP_DIR):
+    if not os.path.isdir(backup_dir):
+        return []
+    hasil = []
+    for nama in sorted(os.listdir(backup_dir), reverse=True):
+        if not _BACKUP_NAME.match(nama):
+            continue
+        path = os.path.join(backup_dir, nama)
+        try:
+            with open(path + ".json") as f:
+                info = json.load(f)
+        except (FileNotFoundError, ValueError):
+            info = {'name': nama, 'label': '', 'created_at': None, 'duration': None}
+        info['size'] = os.path.getsize(path)
+        hasil.append(info)
+    return hasil
+
+
+def prune_backups(backup_dir=BACKUP_DIR, keep=BACKUP_KEEP):
+    for info in list_backups(backup_dir)[keep:]:
+        path = os.path.join(backup_dir, info['name'])
+        os.remove(path)
+        if os.path.exists(path + ".json"):
+            os.remove(path + ".json")
+
+
+def restore_backup(conn, name, backup_dir=BACKUP_DIR):
+    path = os.path.join(backup_dir, os.path.basename(name))
+    if not _BACKUP_NAME.match(os.path.basename(path)) or not os.path.exists(path):
+        raise FileNotFoundError(f"Backup {name} tidak ditemukan")
+    mulai = time.perf_counter()
+    # Hanya tabel non-snapshot yang diganti; snapshot tabel hasil reset (tidak ada di file backup)
+    # tetap tersimpan sehingga masih bisa dipulihkan setelah restore file
+    conn.commit()
+    conn.execute("ATTACH DATABASE ? AS pulih", (os.path.abspath(path),))
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for tipe, nama, tbl, _ in _schema(conn):
+                if tipe in ("table", "view") and not _is_table_snapshot(tbl):
+                    conn.execute(f'DROP {tipe.upper()} IF EXISTS main."{nama}"')
+            _copy_objects(conn, "pulih", _schema(conn, "pulih"))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.execute("DETACH DATABASE pulih")
+    return time.perf_counter() - mulai
+
+
+# -------------------------
+# Snapshot tabel (table swap) untuk reset instan
+# -------------------------
+def ensure_snapshot_log(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS beasiswa_snapshot_log (
+            name TEXT PRIMARY KEY,
+            label TEXT,
+            rows INTEGER,
+            duration REAL,
+            created_at TEXT
+        )
+    """)
+
+
+def _swap_out(conn, table):
+    # Tabel aktif di-rename menjadi snapshot lalu diganti tabel kosong dengan skema yang sama
+    schema = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    if schema is None:
+        raise ValueError(f"Tabel {table} tidak ditemukan")
+    rows = conn.execute(f'SELECT count(*) FROM "{table}"').fetchone()[0]
+    nama = _TABLE_PREFIX + _timestamp().replace('-', '_')
+    # Index ikut ter-rename bersama tabel; dipindahkan ke tabel aktif yang baru (masih kosong)
+    indexes = _table_indexes(conn, table)
+    conn.execute(f'ALTER TABLE "{table}" RENAME TO "{nama}"')
+    conn.execute(schema[0])
+    for index_name, sql in indexes:
+        conn.execute(f'DROP INDEX "{index_name}"')
+        conn.execute(sql)
+    return nama, rows
+
+
+def _table_indexes(conn, table):
+    return conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+    ).fetchall()
+
+
+def swap_reset(conn, table="beasiswa", label="reset", keep=BACKUP_KEEP):
+    ensure_snapshot_log(conn)
+    mulai = time.perf_counter()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        nama, rows = _swap_out(conn, table)
+        durasi = time.perf_counter() - mulai
+        conn.execute("INSERT INTO beasiswa_snapshot_log (name, label, rows, duration, created_at) VALUES (?, ?, ?, ?, ?)",
+                     (nama, label, rows, durasi, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    prune_table_snapshots(conn, keep)
+    return {'name': nama, 'rows': rows, 'duration': durasi}
+
+
+def list_table_snapshots(conn):
+    ensure_snapshot_log(conn)
+    return [
+        {'name': name, 'label': label, 'rows': rows, 'size': _table_size(conn, name), 'duration': duration, 'created_at': created_at}
+        for name, label, rows, duration, created_at in conn.execute("""
+            SELECT l.name, l.label, l.rows, l.duration, l.created_at
+            FROM beasiswa_snapshot_log l
+            JOIN sqlite_master m ON m.type = 'table' AND m.name = l.name
+            ORDER BY l.name DESC
+        """).fetchall()
+    ]
+
+
+def _table_size(conn, table):
+    # Ukuran halaman yang dipakai tabel beserta index-nya (virtual table dbstat);
+    # None bila SQLite dikompilasi tanpa dbstat
+    try:
+        return conn.execute("""
+            SELECT coalesce(sum(s.pgsize), 0)
+            FROM sqlite_master m
+            JOIN dbstat s ON s.name = m.name
+            WHERE m.tbl_name = ? AND m.type IN ('table', 'index')
+        """, (table,)).fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+
+
+def prune_table_snapshots(conn, keep=BACKUP_KEEP):
+    for info in list_table_snapshots(conn)[keep:]:
+        conn.execute(f'DROP TABLE IF EXISTS "{info["name"]}"')
+        conn.execute("DELETE FROM beasiswa_snapshot_log WHERE name = ?", (info['name'],))
+    conn.commit()
+
+
+def restore_table_snapshot(conn, name, table="beasiswa", keep=BACKUP_KEEP):
+    # Data aktif disimpan sebagai snapshot baru sehingga restore juga bisa dibatalkan
+    if not name.startswith(_TABLE_PREFIX) or name not in {s['name'] for s in list_table_snapshots(conn)}:
+        raise ValueError(f"Snapshot tabel {name} tidak ditemukan")
+    mulai = time.perf_counter()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        nama_lama, rows = _swap_out(conn, table)
+        indexes = _table_indexes(conn, table)
+        conn.execute(f'DROP TABLE "{table}"')
+        conn.execute(f'ALTER TABLE "{name}" RENAME TO "{table}"')
+        for _, sql in indexes:
+            conn.execute(sql)
+        conn.execute("DELETE FROM beasiswa_snapshot_log WHERE name = ?", (name,))
+        durasi = time.perf_counter() - mulai
+        conn.execute("INSERT INTO beasiswa_snapshot_log (name, label, rows, duration, created_at) VALUES (?, ?, ?, ?, ?)",
+                     (nama_lama, "sebelum-restore", rows, durasi, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    prune_table_snapshots(conn, keep)
+    return durasi
@@ -0,0 +1,337 @@
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import zlib
+import numpy as np
+import pandas as pd
+
+# -------------------------
+# Parameter MinHash / LSH
+# -------------------------
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS  # ambang kandidat ~ (1/16)^(1/8) = 0.71
+SHINGLE_SIZE = 4
+DEFAULT_THRESHOLD = 0.8
+MAX_BUCKET_SIZE = 256
+MAX_BUCKET_ROUNDS = 4
+
+_PRIME = np.uint64(4294967311)  # bilangan prima > 2^32
+_rng = np.random.RandomState(20240601)
+_PERM_A = _rng.randint(1, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+
+DEDUP_FIELDS = ['nama_lembaga', 'program_beasiswa', 'link', 'benefit']
+
+
+# -------------------------
+# Normalisasi teks dan signature MinHash
+# -------------------------
+def _normalize_link(link):
+    link = link.lower().strip()
+    link = re.sub(r'^https?://', '', link)
+    link = re.sub(r'^www\.', '', link)
+    return link.rstrip('/')
+
+
+def record_text(nama_lembaga, program_beasiswa, link, benefit):
+    bagian = []
+    for kolom, nilai in zip(DEDUP_FIELDS, (nama_lembaga, program_beasiswa, link, benefit)):
+        if nilai is None or pd.isna(nilai):
+            continue
+        nilai = str(nilai)
+        if kolom == 'link':
+            nilai = _normalize_link(nilai)
+        bagian.append(nilai.lower())
+    return re.sub(r'[^a-z0-9]+', ' ', ' '.join(bagian)).strip()
+
+
+def _shingle_hashes(teks):
+    if len(teks) < SHINGLE_SIZE:
+        shingles = {teks} if teks else set()
+    else:
+        shingles = {teks[i:i + SHINGLE_SIZE] for i in range(len(teks) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signature(teks):
+    hashes = _shingle_hashes(teks)
+    if len(hashes) == 0:
+        return None
+    # Semua permutasi sekaligus: (a * x + b) mod p, lalu ambil minimum per permutasi
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def band_keys(signature):
+    keys = []
+    for band in range(BANDS):
+        potongan = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
+        keys.append(int.from_bytes(hashlib.blake2b(potongan, digest_size=8).digest(), 'little', signed=True))
+    return keys
+
+
+def estimated_similarity(sig_a, sig_b):
+    return float(np.mean(sig_a == sig_b))
+
+
+# -------------------------
+# Tabel indeks LSH di SQLite
+# -------------------------
+def ensure_dedup_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS beasiswa_minhash (
+            id TEXT PRIMARY KEY,
+            signature BLOB
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS beasiswa_lsh (
+            band INTEGER,
+            bucket INTEGER,
+            id TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_bucket ON beasiswa_lsh (band, bucket)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_id ON beasiswa_lsh (id)")
+
+
+def remove_record(conn, id_value):
+    ensure_dedup_tables(conn)
+    conn.execute("DELETE FROM beasiswa_minhash WHERE id = ?", (str(id_value),))
+    conn.execute("DELETE FROM beasiswa_lsh WHERE id = ?", (str(id_value),))
+
+
+def index_records(conn, rows, replace=False):
+    # rows: iterable berisi (id, nama_lembaga, program_beasiswa, link, benefit)
+    ensure_dedup_tables(conn)
+    for id_value, *fields in rows:
+        id_value = str(id_value)
+        if replace:
+            remove_record(conn, id_value)
+        signature = minhash_signature(record_text(*fields))
+        if signature is None:
+            continue
+        cursor = conn.execute("INSERT OR IGNORE INTO beasiswa_minhash (id, signature) VALUES (?, ?)",
+                              (id_value, signature.tobytes()))
+        if cursor.rowcount:
+            conn.executemany("INSERT INTO beasiswa_lsh (band, bucket, id) VALUES (?, ?, ?)",
+                             [(band, key, id_value) for band, key in enumerate(band_keys(signature))])
+
+
+def clear_index(conn):
+    ensure_dedup_tables(conn)
+    conn.execute("DELETE FROM beasiswa_minhash")
+    conn.execute("DELETE FROM beasiswa_lsh")
+
+
+def rebuild_index(conn, chunk_size=5000):
+    clear_index(conn)
+    cursor = conn.execute("SELECT id, nama_lembaga, program_beasiswa, link, benefit FROM beasiswa")
+    total = 0
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        index_records(conn, rows)
+        total += len(rows)
+    conn.commit()
+    return total
+
+
+def backfill_index(conn, chunk_size=5000):
+    # Data lama yang belum punya signature diindeks sekali (mis. database yang sudah ada sebelum fitur ini)
+    ensure_dedup_tables(conn)
+    cursor = conn.execute("""
+        SELECT b.id, b.nama_lembaga, b.program_beasiswa, b.link, b.benefit
+        FROM beasiswa b
+        LEFT JOIN beasiswa_minhash m ON m.id = b.id
+        WHERE m.id IS NULL
+    """)
+    total = 0
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        index_records(conn, rows)
+        total += len(rows)
+    conn.commit()
+    return total
+
+
+def _load_signatures(conn, ids):
+    signatures = {}
+    ids = list(ids)
+    for i in range(0, len(ids), 500):
+        potongan = ids[i:i + 500]
+        placeholders = ",".join("?" * len(potongan))
+        for id_value, blob in conn.execute(
+                f"SELECT id, signature FROM beasiswa_minhash WHERE id IN ({placeholders})", potongan):
+            signatures[id_value] = np.frombuffer(blob, dtype=np.uint32)
+    return signatures
+
+
+# -------------------------
+# Pencarian duplikat
+# -------------------------
+def find_similar(conn, id_value, threshold=DEFAULT_THRESHOLD):
+    # Kandidat untuk satu record (dipakai setelah insert)
+    ensure_dedup_tables(conn)
+    id_value = str(id_value)
+    kandidat = [row[0] for row in conn.execute("""
+        SELECT DISTINCT other.id
+        FROM beasiswa_lsh self
+        JOIN beasiswa_lsh other ON other.band = self.band AND other.bucket = self.bucket
+        WHERE self.id = ? AND other.id != self.id
+    """, (id_value,))]
+    if not kandidat:
+        return []
+    signatures = _load_signatures(conn, kandidat + [id_value])
+    if id_value not in signatures:
+        return []
+    hasil = []
+    for other in kandidat:
+        sim = estimated_similarity(signatures[id_value], signatures[other])
+        if sim >= threshold:
+            hasil.append((other, sim))
+    return sorted(hasil, key=lambda x: -x[1])
+
+
+def _bucket_pairs(anggota, matrix, threshold):
+    # Setiap anggota dibandingkan dengan satu perwakilan, bukan semua pasangan; anggota yang tidak
+    # cocok membentuk putaran berikutnya dengan perwakilan baru (maksimal MAX_BUCKET_ROUNDS putaran)
+    sisa = anggota
+    for _ in range(MAX_BUCKET_ROUNDS):
+        if len(sisa) < 2:
+            break
+        rep, lain = sisa[0], sisa[1:]
+        sims = (matrix[lain] == matrix[rep]).mean(axis=1)
+        cocok = sims >= threshold
+        for other, sim in zip(lain[cocok], sims[cocok]):
+            yield rep, other, float(sim)
+        sisa = lain[~cocok]
+
+
+def find_duplicate_clusters(conn, threshold=DEFAULT_THRESHOLD):
+    ensure_dedup_tables(conn)
+    buckets = [ids.split('\x1f') for (ids,) in conn.execute("""
+        SELECT group_concat(id, char(31))
+        FROM beasiswa_lsh
+        GROUP BY band, bucket
+        HAVING count(*) > 1
+    """)]
+    if not buckets:
+        return []
+
+    signatures = _load_signatures(conn, {x for ids in buckets for x in ids})
+    id_list = sorted(signatures)
+    posisi = {id_value: i for i, id_value in enumerate(id_list)}
+    matrix = np.stack([signatures[x] for x in id_list])
+
+    # Setiap anggota harus terverifikasi mirip dengan pemimpin clusternya, sehingga cluster tidak
+    # merambat lewat rantai A~B~C; kemiripan cluster = skor terendah anggota terhadap pemimpin
+    leader = {}
+    min_sim = {}
+
+    def gabung(pemimpin, anggota, sim=None):
+        if sim is None:
+            sim = float((matrix[anggota] == matrix[pemimpin]).mean())
+        if sim >= threshold:
+            leader[anggota] = pemimpin
+            min_sim[pemimpin] = min(min_sim.get(pemimpin, 1.0), sim)
+
+    for ids in buckets:
+        anggota = np.array(sorted({posisi[x] for x in ids if x in posisi}), dtype=np.int64)
+        # Bucket yang terlalu besar (teks boilerplate) dipecah agar biaya tetap linear
+        for mulai in range(0, len(anggota), MAX_BUCKET_SIZE):
+            for a, b, sim in _bucket_pairs(anggota[mulai:mulai + MAX_BUCKET_SIZE], matrix, threshold):
+                la, lb = leader.get(a), leader.get(b)
+                if la is None and lb is None:
+                    leader[a] = a
+                    gabung(a, b, sim)
+                elif lb is None:
+                    gabung(la, b, sim if la == a else None)
+                elif la is None:
+                    gabung(lb, a, sim if lb == b else None)
+
+    clusters = {}
+    for i, pemimpin in leader.items():
+        clusters.setdefault(pemimpin, []).append(id_list[i])
+    hasil = [
+        {'ids': sorted(anggota), 'similarity': min_sim[pemimpin]}
+        for pemimpin, anggota in clusters.items()
+        if len(anggota) > 1
+    ]
+    return sorted(hasil, key=lambda c: (-len(c['ids']), -c['similarity']))
+
+
+# -------------------------
+# Penggabungan record duplikat
+# -------------------------
+_KOLOM_DATA = ['benua', 'asal_beasiswa', 'nama_lembaga', 'top_univ', 'program_beasiswa',
+               'jenis_beasiswa', 'persyaratan', 'benefit', 'waktu_pendaftaran', 'link']
+
+
+def _kosong(nilai):
+    return nilai is None or pd.isna(nilai) or str(nilai).strip() in ('', '-')
+
+
+def merge_records(conn, keep_id, drop_ids):
+    # Kolom kosong pada record yang dipertahankan diisi dari record duplikat, lalu duplikat dihapus
+    kolom = ", ".join(_KOLOM_DATA)
+    simpan = conn.execute(f"SELECT {kolom} FROM beasiswa WHERE id = ?", (keep_id,)).fetchone()
+    if simpan is None:
+        raise ValueError(f"ID {keep_id} tidak ditemukan")
+    simpan = list(simpan)
+    for drop_id in drop_ids:
+        row = conn.execute(f"SELECT {kolom} FROM beasiswa WHERE id = ?", (drop_id,)).fetchone()
+        if row is None:
+            continue
+        for i, nilai in enumerate(row):
+            if _kosong(simpan[i]) and not _kosong(nilai):
+                simpan[i] = nilai
+
+    set_clause = ", ".join(f"{k}=?" for k in _KOLOM_DATA)
+    conn.execute(f"UPDATE beasiswa SET {set_clause} WHERE id = ?", simpan + [keep_id])
+    for drop_id in drop_ids:
+        conn.execute("DELETE FROM beasiswa WHERE id = ?", (drop_id,))
+        remove_record(conn, drop_id)
+    index_records(conn, [(keep_id, simpan[2], simpan[4], simpan[9], simpan[7])], replace=True)
+    return simpan
+
+
+# -------------------------
+# Mode batch (CLI)
+# -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deteksi duplikat data beasiswa dengan MinHash/LSH")
+    parser.add_argument("--db", default=os.environ.get("BEASISWA_DB", "beasiswa.db"), help="Path database SQLite")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="Bangun ulang seluruh indeks MinHash/LSH")
+    clusters = sub.add_parser("clusters", help="Tampilkan kelompok kandidat duplikat")
+    clusters.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    clusters.add_argument("--csv", help="Simpan hasil ke file CSV")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.command == "rebuild":
+            total = rebuild_index(conn)
+            print(f"Indeks dibangun ulang untuk {total} record")
+        else:
+            hasil = find_duplicate_clusters(conn, args.threshold)
+            rows = [(i + 1, id_value, c['similarity']) for i, c in enumerate(hasil) for id_value in c['ids']]
+            df = pd.DataFrame(rows, columns=['cluster', 'id', 'similarity'])
+            if args.csv:
+                df.to_csv(args.csv, index=False)
+            print(f"{len(hasil)} kelompok duplikat ditemukan")
+            if not df.empty:
+                print(df.to_string(index=False))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+import argparse
+import calendar
+import html
+import os
+import smtplib
+import socketserver
+import sqlite3
+from datetime import date, datetime, timedelta
+from email.message import EmailMessage
+import pandas as pd
+
+# -------------------------
+# Parsing waktu pendaftaran
+# -------------------------
+CLOSING_WINDOW_DAYS = 30
+
+BULAN = {
+    'januari': 1, 'februari': 2, 'maret': 3, 'april': 4, 'mei': 5, 'juni': 6,
+    'juli': 7, 'agustus': 8, 'september': 9, 'oktober': 10, 'november': 11, 'desember': 12,
+    'january': 1, 'february': 2, 'march': 3, 'may': 5, 'june': 6, 'july': 7,
+    'august': 8, 'october': 10, 'december': 12,
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'jun': 6, 'jul': 7, 'agu': 8, 'agt': 8,
+    'aug': 8, 'sep': 9, 'okt': 10, 'oct': 10, 'nov': 11, 'des': 12, 'dec': 12,
+}
+NAMA_BULAN = ['', 'Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni', 'Juli',
+              'Agustus', 'September', 'Oktober', 'November', 'Desember']
+
+DIGEST_COLUMNS = ['id', 'nama_lembaga', 'program_beasiswa', 'benua', 'asal_beasiswa', 'waktu_pendaftaran', 'link']
+
+
+def parse_deadlines(waktu, today):
+    # Deadline diambil dari bagian setelah '-' terakhir: "Januari - Februari", "1-15 Januari",
+    # "10 Maret 2025 - 30 Oktober 2025", atau tanggal tunggal "10 Maret 2025"
+    akhir = waktu.fillna('').astype(str).str.split('-').str[-1].str.strip().str.lower()
+    bagian = akhir.str.extract(r'^(?:(\d{1,2})\s+)?([a-z]+)\.?(?:\s+(\d{4}))?$')
+    bulan = pd.to_numeric(bagian[1].map(BULAN), errors='coerce')
+    valid = bulan.notna()
+    if not valid.any():
+        return pd.Series(pd.NaT, index=waktu.index, dtype='datetime64[ns]')
+
+    bulan = bulan[valid].astype(int)
+    hari = pd.to_numeric(bagian.loc[valid, 0], errors='coerce')
+    # Tanpa tahun, bulan yang sudah lewat berarti periode tahun depan
+    tahun = pd.to_numeric(bagian.loc[valid, 2], errors='coerce').fillna(today.year + (bulan < today.month)).astype(int)
+    awal = pd.to_datetime(pd.DataFrame({'year': tahun, 'month': bulan, 'day': 1}))
+    akhir_bulan = awal + pd.offsets.MonthEnd(0)
+    deadline = (awal + pd.to_timedelta(hari - 1, unit='D')).where(hari.notna(), akhir_bulan)
+    deadline = deadline.where(deadline <= akhir_bulan, akhir_bulan)
+    return deadline.reindex(waktu.index).astype('datetime64[ns]')
+
+
+def compute_digest(df, today=None, window_days=CLOSING_WINDOW_DAYS):
+    today = today or date.today()
+    if df.empty:
+        return pd.DataFrame(columns=DIGEST_COLUMNS + ['deadline'])
+    deadline = parse_deadlines(df['waktu_pendaftaran'], today)
+    batas = pd.Timestamp(today + timedelta(days=window_days))
+    # Sama seperti sebelumnya: ditutup bulan ini atau bulan depan (dalam jendela window_days)
+    bulan_batas = pd.Timestamp(batas.year, batas.month, calendar.monthrange(batas.year, batas.month)[1])
+    closing = (deadline >= pd.Timestamp(today)) & (deadline <= bulan_batas)
+    hasil = df.loc[closing, DIGEST_COLUMNS].copy()
+    hasil['deadline'] = deadline[closing].dt.date
+    return hasil.sort_values(['deadline', 'benua', 'program_beasiswa', 'nama_lembaga']).reset_index(drop=True)
+
+
+def load_closing(conn, today=None):
+    df = pd.read_sql_query(f"SELECT {', '.join(DIGEST_COLUMNS)} FROM beasiswa WHERE waktu_pendaftaran IS NOT NULL", conn)
+    return compute_digest(df, today)
+
+
+def filter_digest(digest, benua=None, program=None):
+    hasil = digest
+    if benua:
+        hasil = hasil[hasil['benua'].str.lower().isin([b.lower() for b in benua])]
+    if program:
+        hasil = hasil[hasil['program_beasiswa'].str.lower().isin([p.lower() for p in program])]
+    return hasil
+
+
+def _teks(nilai):
+    return '-' if nilai is None or pd.isna(nilai) or not str(nilai).strip() else str(nilai)
+
+
+def group_digest(digest):
+    # deadline -> benua -> program -> daftar baris
+    grup = {}
+    for row in digest.itertuples(index=False):
+        grup.setdefault(row.deadline, {}).setdefault(_teks(row.benua), {}).setdefault(_teks(row.program_beasiswa), []).append(row)
+    return grup
+
+
+def format_tanggal(tanggal):
+    return f"{tanggal.day} {NAMA_BULAN[tanggal.month]} {tanggal.year}"
+
+
+# -------------------------
+# Render HTML dan teks
+# -------------------------
+def render_html(digest, judul="⏰ Beasiswa yang Akan Segera Ditutup"):
+    bagian = [f"<h3>{html.escape(judul)}</h3>"]
+    for deadline, per_benua in group_digest(digest).items():
+        jumlah = sum(len(rows) for p in per_benua.values() for rows in p.values())
+        bagian.append(f"<h4>📅 {format_tanggal(deadline)} ({jumlah} beasiswa)</h4><ul>")
+        for benua, per_program in per_benua.items():
+            for program, rows in per_program.items():
+                daftar = ", ".join(
+                    f'<a href="{html.escape(str(r.link))}">{html.escape(_teks(r.nama_lembaga))}</a>' if _teks(r.link) != '-'
+                    else html.escape(_teks(r.nama_lembaga))
+                    for r in rows
+                )
+                bagian.append(f"<li><b>{html.escape(benua)}</b> · {html.escape(program)}: {daftar}</li>")
+        bagian.append("</ul>")
+    return "\n".join(bagian)
+
+
+def render_text(digest):
+    baris = []
+    for deadline, per_benua in group_digest(digest).items():
+        baris.append(f"{format_tanggal(deadline)}")
+        for benua, per_program in per_benua.items():
+            for program, rows in per_program.items():
+                baris.append(f"  - {benua} / {program}: " + ", ".join(
+                    _teks(r.nama_lembaga) + (f" ({r.link})" if _teks(r.link) != '-' else "") for r in rows))
+    return "\n".join(baris)
+
+
+# -------------------------
+# Pelanggan digest
+# -------------------------
+def ensure_digest_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS digest_subscriber (
+            email TEXT PRIMARY KEY,
+            nama TEXT,
+            benua TEXT,
+            program TEXT,
+            aktif INTEGER DEFAULT 1,
+            created_at TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS digest_log (
+            tanggal TEXT,
+            email TEXT,
+            jumlah INTEGER,
+            sent_at TEXT,
+            PRIMARY KEY (tanggal, email)
+        )
+    """)
+
+
+def _split(nilai):
+    return [x.strip() for x in (nilai or '').split(',') if x.strip()]
+
+
+def add_subscriber(conn, email, nama="", benua=(), program=()):
+    ensure_digest_tables(conn)
+    conn.execute("""
+        INSERT OR REPLACE INTO digest_subscriber (email, nama, benua, program, aktif, created_at)
+        VALUES (?, ?, ?, ?, 1, ?)
+    """, (email.strip(), nama, ",".join(benua), ",".join(program), datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    conn.commit()
+
+
+def remove_subscriber(conn, email):
+    ensure_digest_tables(conn)
+    conn.execute("DELETE FROM digest_subscriber WHERE email = ?", (email,))
+    conn.commit()
+
+
+def list_subscribers(conn):
+    ensure_digest_tables(conn)
+    return pd.read_sql_query("SELECT email, nama, benua, program, aktif, created_at FROM digest_subscriber ORDER BY email", conn)
+
+
+def build_messages(conn, digest, sender_address, today=None, force=False):
+    # Satu email per pelanggan dari digest yang sudah dihitung; pelanggan yang sudah dikirimi hari ini dilewati
+    today = today or date.today()
+    ensure_digest_tables(conn)
+    sudah = set() if force else {row[0] for row in conn.execute(
+        "SELECT email FROM digest_log WHERE tanggal = ?", (today.isoformat(),))}
+    messages = []
+    for email, nama, benua, program in conn.execute(
+            "SELECT email, nama, benua, program FROM digest_subscriber WHERE aktif = 1"):
+        if email in sudah:
+            continue
+        bagian = filter_digest(digest, _split(benua), _split(program))
+        if bagian.empty:
+            continue
+        msg = EmailMessage()
+        msg['Subject'] = f"[Portal Beasiswa] {len(bagian)} beasiswa segera ditutup ({format_tanggal(today)})"
+        msg['From'] = sender_address
+        msg['To'] = email
+        msg.set_content(f"Halo {nama or email},\n\n{render_text(bagian)}\n")
+        msg.add_alternative(f"<p>Halo {html.escape(nama or email)},</p>{render_html(bagian)}", subtype='html')
+        messages.append((email, len(bagian), msg))
+    return messages
+
+
+def send_digest(conn, digest, sender, sender_address, today=None, force=False):
+    today = today or date.today()
+    messages = build_messages(conn, digest, sender_address, today, force)
+    if messages:
+        sender.send_batch([msg for _, _, msg in messages])
+        conn.executemany("INSERT OR REPLACE INTO digest_log (tanggal, email, jumlah, sent_at) VALUES (?, ?, ?, ?)",
+                         [(today.isoformat(), email, jumlah, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                          for email, jumlah, _ in messages])
+        conn.commit()
+    return len(messages)
+
+
+# -------------------------
+# Pengirim (pluggable)
+# -------------------------
+class SmtpSender:
+    def __init__(self, host="localhost", port=25, username=None, password=None, use_tls=False):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+
+    def send_batch(self, messages):
+        # Satu koneksi SMTP untuk seluruh batch
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for msg in messages:
+                smtp.send_message(msg)
+
+
+class FileSender:
+    def __init__(self, directory="outbox"):
+        self.directory = directory
+
+    def send_batch(self, messages):
+        os.makedirs(self.directory, exist_ok=True)
+        for i, msg in enumerate(messages):
+            nama = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{i:04d}-{msg['To']}.eml"
+            with open(os.path.join(self.directory, nama), "wb") as f:
+                f.write(bytes(msg))
+
+
+SENDERS = {
+    'smtp': lambda: SmtpSender(
+        os.environ.get("DIGEST_SMTP_HOST", "localhost"),
+        int(os.environ.get("DIGEST_SMTP_PORT", "1025")),
+        os.environ.get("DIGEST_SMTP_USER"),
+        os.environ.get("DIGEST_SMTP_PASSWORD"),
+        os.environ.get("DIGEST_SMTP_TLS", "0") == "1",
+    ),
+    'file': lambda: FileSender(os.environ.get("DIGEST_OUTBOX", "outbox")),
+}
+DIGEST_SENDER = os.environ.get("DIGEST_SENDER", "smtp").strip().lower()
+DIGEST_FROM = os.environ.get("DIGEST_FROM", "noreply@portal-beasiswa.local")
+
+if DIGEST_SENDER not in SENDERS:
+    raise ValueError(f"DIGEST_SENDER harus salah satu dari {', '.join(SENDERS)}, bukan '{DIGEST_SENDER}'")
+
+
+def get_sender(name=None):
+    name = name or DIGEST_SENDER
+    if name not in SENDERS:
+        raise ValueError(f"Pengirim digest '{name}' tidak dikenal (pilihan: {', '.join(SENDERS)})")
+    return SENDERS[name]()
+
+
+# -------------------------
+# Server SMTP lokal untuk pengujian (pengganti server email sungguhan)
+# -------------------------
+class _SmtpSinkHandler(socketserver.StreamRequestHandler):
+    def _reply(self, teks):
+        self.wfile.write(f"{teks}\r\n".encode())
+
+    def handle(self):
+        self._reply("220 localhost SMTP sink")
+        mail_from, rcpt_to = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            perintah = line.decode(errors='replace').strip()
+            verb = perintah.split(' ', 1)[0].upper()
+            if verb in ('HELO', 'EHLO'):
+                self._reply("250 localhost")
+            elif verb == 'MAIL':
+                mail_from, rcpt_to = perintah[10:].strip(), []
+                self._reply("250 OK")
+            elif verb == 'RCPT':
+                rcpt_to.append(perintah[8:].strip())
+                self._reply("250 OK")
+            elif verb == 'DATA':
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    baris = self.rfile.readline()
+                    if not baris or baris in (b".\r\n", b".\n"):
+                        break
+                    data.append(baris[1:] if baris.startswith(b"..") else baris)
+                self.server.messages.append({'from': mail_from, 'to': rcpt_to, 'data': b"".join(data)})
+                if self.server.directory:
+                    os.makedirs(self.server.directory, exist_ok=True)
+                    nama = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.eml"
+                    with open(os.path.join(self.server.directory, nama), "wb") as f:
+                        f.write(b"".join(data))
+                self._reply("250 OK")
+            elif verb in ('RSET', 'NOOP'):
+                self._reply("250 OK")
+            elif verb == 'QUIT':
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class LocalSmtpServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, host="localhost", port=1025, directory=None):
+        super().__init__((host, port), _SmtpSinkHandler)
+        self.messages = []
+        self.directory = directory
+
+
+# -------------------------
+# Mode batch (CLI)
+# -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Digest beasiswa yang akan segera ditutup")
+    parser.add_argument("--db", default=os.environ.get("BEASISWA_DB", "beasiswa.db"), help="Path database SQLite")
+    sub = parser.add_subparsers(dest="command", required=True)
+    kirim = sub.add_parser("send", help="Kirim digest ke semua pelanggan")
+    kirim.add_argument("--sender", choices=list(SENDERS), default=DIGEST_SENDER)
+    kirim.add_argument("--force", action="store_true", help="Kirim ulang walaupun sudah terkirim hari ini")
+    sub.add_parser("preview", help="Tampilkan digest hari ini")
+    sink = sub.add_parser("smtp-sink", help="Jalankan server SMTP lokal untuk pengujian")
+    sink.add_argument("--host", default="localhost")
+    sink.add_argument("--port", type=int, default=1025)
+    sink.add_argument("--dir", default="outbox", help="Folder penyimpanan email yang diterima")
+    args = parser.parse_args(argv)
+
+    if args.command == "smtp-sink":
+        with LocalSmtpServer(args.host, args.port, args.dir) as server:
+            print(f"SMTP sink berjalan di {args.host}:{args.port}, email disimpan di {args.dir}/")
+            server.serve_forever()
+        return
+
+    conn = sqlite3.connect(args.db)
+    try:
+        digest = load_closing(conn)
+        if args.command == "preview":
+            print(render_text(digest) or "Tidak ada beasiswa yang akan segera ditutup")
+        else:
+            terkirim = send_digest(conn, digest, get_sender(args.sender), DIGEST_FROM, force=args.force)
+            print(f"Digest dikirim ke {terkirim} pelanggan")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,30 +5,80 @@ import plotly.express as px
 from io import BytesIO
 from fuzzywuzzy import process
 import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 import base64
+import os
 from fpdf import FPDF
+import time
+from matching import JENJANG, MatchingIndexCache, ensure_feature_table, build_matching_index, update_matching_index, save_requirements, delete_requirements
+from dedup import ensure_dedup_tables, backfill_index, index_records, remove_record, find_similar, find_duplicate_clusters, merge_records, rebuild_index
+from snapshot import DB_PATH, DB_ROLE, SNAPSHOT_DIR, current_snapshot, open_snapshot, publish_snapshot
+from backup import BACKUP_KEEP, create_backup, list_backups, prune_backups, restore_backup, swap_reset, list_table_snapshots, restore_table_snapshot
+from typeahead import TYPEAHEAD_COLUMNS, build_typeahead_index
+from link_checker import ensure_link_table, refresh_link_status, link_status_map, link_badge, DEFAULT_MAX_AGE_DAYS
+from digest import DIGEST_FROM, SENDERS, DIGEST_SENDER, load_closing, render_html, format_tanggal, ensure_digest_tables, add_subscriber, remove_subscriber, list_subscribers, send_digest, get_sender
 import warnings
 warnings.filterwarnings('ignore')
 # -------------------------
 # Fungsi koneksi database
 # -------------------------
-def get_connection():
-    return sqlite3.connect("beasiswa.db")
+def get_connection(write=False):
+    # Replika reader membaca snapshot read-only terbaru yang diterbitkan node writer
+    if DB_ROLE == "reader":
+        if write:
+            raise RuntimeError("Replika ini read-only; perubahan data hanya bisa dilakukan di node writer")
+        path = current_snapshot(SNAPSHOT_DIR)
+        if path is None:
+            raise RuntimeError("Belum ada snapshot yang diterbitkan oleh node writer")
+        return open_snapshot(path)
+    return sqlite3.connect(DB_PATH)
+
+def data_version():
+    # Kunci cache: nama snapshot aktif untuk reader, konstan untuk writer (cache dibersihkan saat menulis).
+    # Cache indeks hanya menyimpan satu versi agar indeks dari snapshot lama tidak menumpuk di memori reader;
+    # indeks versi lama tetap dilayani sampai indeks snapshot baru selesai dibangun di thread latar
+    if DB_ROLE == "reader":
+        return current_snapshot(SNAPSHOT_DIR)
+    return None
+
+@st.cache_resource
+def init_database():
+    conn = get_connection(write=True)
+    ensure_feature_table(conn)
+    ensure_dedup_tables(conn)
+    backfill_index(conn)
+    ensure_link_table(conn)
+    ensure_digest_tables(conn)
+    conn.commit()
+    if SNAPSHOT_DIR and current_snapshot(SNAPSHOT_DIR) is None:
+        publish_snapshot(conn, SNAPSHOT_DIR)
+    conn.close()
 
 # -------------------------
 # Fungsi insert, fetch, delete, update
 # -------------------------
 def insert_data(data):
-    conn = get_connection()
+    typeahead = load_typeahead_index(data_version())
+    conn = get_connection(write=True)
     cursor = conn.cursor()
     cursor.executemany("""
         INSERT OR IGNORE INTO beasiswa 
         (id, benua, asal_beasiswa, nama_lembaga, top_univ, program_beasiswa, jenis_beasiswa, persyaratan, benefit, waktu_pendaftaran, link, created_at)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, data)
+    inserted = cursor.rowcount
+    save_requirements(conn, [(row[0], row[7], row[8]) for row in data])
+    index_records(conn, [(row[0], row[3], row[5], row[10], row[8]) for row in data])
     conn.commit()
     conn.close()
+    if inserted == len(data):
+        for row in data:
+            typeahead.add_row({'asal_beasiswa': row[2], 'nama_lembaga': row[3], 'top_univ': row[4]})
+    else:
+        # Sebagian baris diabaikan (ID sudah ada), bangun ulang dari database
+        load_typeahead_index.clear()
+    refresh_matching_index(ids_baru=[row[0] for row in data])
+    after_write()
 
 def fetch_data():
     conn = get_connection()
@@ -36,24 +86,157 @@ def fetch_data():
     conn.close()
     return df
 
+def fetch_typeahead_values(cursor, id_value):
+    cursor.execute(f"SELECT {', '.join(TYPEAHEAD_COLUMNS)} FROM beasiswa WHERE id = ?", (id_value,))
+    return [dict(zip(TYPEAHEAD_COLUMNS, row)) for row in cursor.fetchall()]
+
 def delete_data_by_id(id_value):
-    conn = get_connection()
+    typeahead = load_typeahead_index(data_version())
+    conn = get_connection(write=True)
     cursor = conn.cursor()
+    old_rows = fetch_typeahead_values(cursor, id_value)
     cursor.execute("DELETE FROM beasiswa WHERE id = ?", (id_value,))
+    delete_requirements(conn, id_value)
+    remove_record(conn, id_value)
     conn.commit()
     conn.close()
+    for row in old_rows:
+        typeahead.remove_row(row)
+    refresh_matching_index(ids_hapus=[id_value])
+    after_write()
 
 def update_data_by_id(id_value, updated_row):
-    conn = get_connection()
+    typeahead = load_typeahead_index(data_version())
+    conn = get_connection(write=True)
     cursor = conn.cursor()
+    old_rows = fetch_typeahead_values(cursor, id_value)
     cursor.execute("""
         UPDATE beasiswa
         SET benua=?, asal_beasiswa=?, nama_lembaga=?, top_univ=?,
             program_beasiswa=?, jenis_beasiswa=?, persyaratan=?, benefit=?, waktu_pendaftaran=?, link=?
         WHERE id=?
     """, (updated_row[0], updated_row[1], updated_row[2], updated_row[3], updated_row[4], updated_row[5], updated_row[6], updated_row[7], updated_row[8], updated_row[9], id_value))
+    save_requirements(conn, [(id_value, updated_row[6], updated_row[7])], replace=True)
+    index_records(conn, [(id_value, updated_row[2], updated_row[4], updated_row[9], updated_row[7])], replace=True)
     conn.commit()
     conn.close()
+    for row in old_rows:
+        typeahead.remove_row(row)
+        typeahead.add_row({'asal_beasiswa': updated_row[1], 'nama_lembaga': updated_row[2], 'top_univ': updated_row[3]})
+    refresh_matching_index(ids_baru=[id_value])
+    after_write()
+
+def merge_duplicates(keep_id, drop_ids):
+    conn = get_connection(write=True)
+    merged = merge_records(conn, keep_id, drop_ids)
+    for drop_id in drop_ids:
+        delete_requirements(conn, drop_id)
+    save_requirements(conn, [(keep_id, merged[6], merged[7])], replace=True)
+    conn.commit()
+    conn.close()
+    load_typeahead_index.clear()
+    refresh_matching_index(ids_baru=[keep_id], ids_hapus=drop_ids)
+    after_write()
+
+def reset_derived_tables(conn):
+    # Tabel turunan dibuang utuh (lebih cepat daripada DELETE per baris) lalu dibuat ulang kosong
+    for table in ("beasiswa_fitur", "beasiswa_minhash", "beasiswa_lsh"):
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+    ensure_feature_table(conn)
+    ensure_dedup_tables(conn)
+    conn.commit()
+
+def find_duplicates_of(id_value):
+    conn = get_connection()
+    hasil = find_similar(conn, id_value)
+    conn.close()
+    return hasil
+
+# -------------------------
+# Cache indeks yang dibangun dari database
+# -------------------------
+def _build_matching_index(versi):
+    conn = get_connection()
+    index = build_matching_index(conn, simpan_fitur=DB_ROLE == "writer")
+    conn.close()
+    return index
+
+@st.cache_resource
+def matching_index_cache():
+    return MatchingIndexCache(_build_matching_index)
+
+def load_matching_index(versi):
+    with st.spinner("Menyiapkan indeks pencocokan..."):
+        return matching_index_cache().get(versi)
+
+@st.cache_resource(show_spinner="Menyiapkan indeks saran...", max_entries=1)
+def load_typeahead_index(versi):
+    # Diperbarui langsung oleh fungsi tulis; hanya dibangun ulang setelah reset/restore/merge
+    conn = get_connection()
+    index = build_typeahead_index(conn)
+    conn.close()
+    return index
+
+def refresh_matching_index(ids_baru=(), ids_hapus=()):
+    # Indeks pencocokan diperbarui per baris; dibangun ulang penuh hanya setelah banyak perubahan
+    cache = matching_index_cache()
+    index = cache.peek(data_version())
+    if index is None:
+        # Belum ada indeks di memori: tidak perlu dibangun di sini, kueri profil berikutnya yang membangunnya.
+        # Build yang mungkin sedang berjalan dibuang karena bisa belum memuat perubahan ini
+        cache.clear()
+        return
+    conn = get_connection()
+    update_matching_index(index, conn, ids_baru, ids_hapus)
+    conn.close()
+    if index.perlu_rebuild:
+        cache.clear()
+
+def invalidate_caches():
+    # Dipanggil setelah setiap penulisan; indeks pencocokan tidak ikut dibuang karena diperbarui
+    # langsung oleh fungsi tulis (lihat refresh_matching_index)
+    load_closing_digest.clear()
+
+def after_write():
+    invalidate_caches()
+    if DB_ROLE == "writer" and SNAPSHOT_DIR:
+        conn = get_connection()
+        publish_snapshot(conn, SNAPSHOT_DIR)
+        conn.close()
+
+# -------------------------
+# Fungsi status link
+# -------------------------
+def add_link_badges(df):
+    conn = get_connection()
+    status = link_status_map(conn)
+    conn.close()
+    df = df.copy()
+    def _badge(link):
+        if pd.isna(link) or str(link).strip() in ('', '-'):
+            return ""
+        return link_badge(status.get(str(link).strip()))
+    badges = df['link'].map(_badge)
+    df.insert(df.columns.get_loc('link') + 1, 'status_link', badges)
+    return df
+
+# -------------------------
+# Fungsi input dengan saran (typeahead)
+# -------------------------
+def _pilih_saran(key, nilai):
+    st.session_state[key] = nilai
+
+def typeahead_input(label, kolom, key, value="", **kwargs):
+    if key not in st.session_state:
+        st.session_state[key] = "" if value is None or pd.isna(value) else str(value)
+    teks = st.text_input(label, key=key, **kwargs)
+    if teks:
+        saran = [s for s in load_typeahead_index(data_version()).suggest(kolom, teks) if s != teks]
+        if saran:
+            st.caption("💡 Saran:")
+            for col, nilai in zip(st.columns(len(saran)), saran):
+                col.button(nilai, key=f"{key}_saran_{nilai}", on_click=_pilih_saran, args=(key, nilai))
+    return teks
 
 # -------------------------
 # Fungsi untuk membaca username dan password dari file Excel
@@ -94,27 +277,16 @@ def create_pdf(df):
 # -------------------------
 # Fungsi untuk notifikasi beasiswa yang akan tutup
 # -------------------------
+@st.cache_data(show_spinner=False, max_entries=1)
+def load_closing_digest(tanggal, versi):
+    # Dihitung sekali per hari (kunci tanggal) dan dibersihkan setelah penulisan
+    conn = get_connection()
+    digest = load_closing(conn, tanggal)
+    conn.close()
+    return digest
+
 def check_closing_scholarships():
-    df = fetch_data()
-    today = datetime.now()
-    closing_soon = []
-    
-    for _, row in df.iterrows():
-        if pd.notna(row['waktu_pendaftaran']):
-            try:
-                # Parse tanggal (format: "Januari - Februari" atau "1-15 Januari")
-                if '-' in row['waktu_pendaftaran']:
-                    parts = row['waktu_pendaftaran'].split('-')
-                    if len(parts) == 2:
-                        month = parts[1].strip()
-                        # Cek jika bulan depan adalah bulan sekarang atau bulan depan
-                        if month.lower() in [today.strftime("%B").lower(), 
-                                           (today + timedelta(days=30)).strftime("%B").lower()]:
-                            closing_soon.append(row['nama_lembaga'])
-            except:
-                pass
-    
-    return closing_soon
+    return load_closing_digest(datetime.now().date(), data_version())
 
 # -------------------------
 # Fungsi untuk integrasi API sederhana
@@ -288,6 +460,15 @@ if 'logged_in' not in st.session_state:
 if 'notifications' not in st.session_state:
     st.session_state.notifications = []
 
+# -------------------------
+# Inisialisasi database sesuai peran node
+# -------------------------
+if DB_ROLE == "writer":
+    init_database()
+elif current_snapshot(SNAPSHOT_DIR) is None:
+    st.error("Belum ada snapshot database dari node writer. Silakan coba lagi beberapa saat lagi.")
+    st.stop()
+
 # -------------------------
 # Halaman Login
 # -------------------------
@@ -337,13 +518,19 @@ with st.sidebar:
     st.caption("Platform informasi beasiswa global")
     st.markdown("---")
     
+    menu_options = ["🏠 Dashboard", "⬆️ Upload Data", "➕ Tambah Data Manual", "📄 Data Tersimpan", 
+                    "✏️ Edit Data", "🗑️ Hapus Data", "📊 Grafik", 
+                    "🔎 Filter Data", "🎯 Cocokkan Profil", "🧬 Duplikat Data", "🩺 Cek Link", "📥 Download Data", "📧 Digest Deadline", "⚠️ Reset Database", "💾 Backup & Restore", "🔗 Integrasi API"]
+    if DB_ROLE == "reader":
+        # Replika read-only hanya menampilkan menu yang tidak mengubah data
+        menu_options = ["🏠 Dashboard", "📄 Data Tersimpan", "📊 Grafik", "🔎 Filter Data", "🎯 Cocokkan Profil", "📥 Download Data"]
     menu = st.selectbox(
         "Navigasi Menu", 
-        ["🏠 Dashboard", "⬆️ Upload Data", "➕ Tambah Data Manual", "📄 Data Tersimpan", 
-         "✏️ Edit Data", "🗑️ Hapus Data", "📊 Grafik", 
-         "🔎 Filter Data", "📥 Download Data", "⚠️ Reset Database", "🔗 Integrasi API"],
+        menu_options,
          index=0
     )
+    if DB_ROLE == "reader":
+        st.caption(f"📦 Snapshot: {os.path.basename(current_snapshot(SNAPSHOT_DIR))}")
     
     st.markdown("---")
     st.markdown("### 📈 Statistik Cepat")
@@ -362,13 +549,11 @@ with st.sidebar:
 # Notifikasi Beasiswa yang Akan Tutup
 # -------------------------
 closing_soon = check_closing_scholarships()
-if closing_soon:
-    for scholarship in closing_soon:
-        st.markdown(f"""
-        <div class="notification notification-warning">
-            <strong>⏰ Peringatan:</strong> Pendaftaran beasiswa dari {scholarship} akan segera ditutup!
-        </div>
-        """, unsafe_allow_html=True)
+if not closing_soon.empty:
+    # Satu ringkasan yang bisa dibuka, dikelompokkan per deadline, benua dan program
+    terdekat = format_tanggal(closing_soon['deadline'].min())
+    with st.expander(f"⏰ {len(closing_soon)} beasiswa akan segera ditutup (terdekat {terdekat})"):
+        st.markdown(render_html(closing_soon, judul="Ringkasan Deadline"), unsafe_allow_html=True)
 
 # -------------------------
 # Tampilan Dashboard
@@ -412,7 +597,7 @@ if menu == "🏠 Dashboard":
     
     # Tabel data terbaru
     st.markdown('<div class="chart-container"><h3>📋 Beasiswa Terbaru</h3>', unsafe_allow_html=True)
-    st.dataframe(df_db.sort_values('id', ascending=False).head(10), use_container_width=True)
+    st.dataframe(add_link_badges(df_db.sort_values('id', ascending=False).head(10)), use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
 # -------------------------
@@ -450,13 +635,13 @@ elif menu == "📄 Data Tersimpan":
     df_db = fetch_data()
 
     with st.expander("🔍 Cari Data"):
-        keyword = st.text_input("Masukkan kata kunci pencarian")
+        keyword = typeahead_input("Masukkan kata kunci pencarian", 'nama_lembaga', key="cari_data_tersimpan")
         if keyword:
             # Mencocokkan nama lembaga dengan fuzzy matching
             df_db['match_score'] = df_db['nama_lembaga'].apply(lambda x: process.extractOne(keyword, [x])[1])
             df_db = df_db[df_db['match_score'] > 70].drop(columns='match_score')  # Ambil yang match score > 70
 
-    st.dataframe(df_db, use_container_width=True)
+    st.dataframe(add_link_badges(df_db), use_container_width=True)
 
 # -------------------------
 # Tambah Data Manual
@@ -465,18 +650,22 @@ elif menu == "➕ Tambah Data Manual":
     st.title("➕ Tambah Data Beasiswa Manual")
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     
+    st.markdown("### 📝 Informasi Beasiswa")
+    # Kolom dengan saran berada di luar form agar setiap isian bisa langsung dicocokkan ke indeks prefix
+    col1, col2 = st.columns(2)
+    with col1:
+        asal_beasiswa = typeahead_input("Asal Beasiswa *", 'asal_beasiswa', key="tambah_asal", placeholder="Contoh: Jepang")
+        nama_lembaga = typeahead_input("Nama Lembaga *", 'nama_lembaga', key="tambah_lembaga", placeholder="Contoh: MEXT")
+    with col2:
+        top_univ = typeahead_input("Top Universitas", 'top_univ', key="tambah_topuniv", placeholder="Contoh: University of Tokyo")
+
     with st.form("form_tambah_manual"):
-        st.markdown("### 📝 Informasi Beasiswa")
-        
         col1, col2 = st.columns(2)
         with col1:
             id_beasiswa = st.text_input("ID Beasiswa *", placeholder="Contoh: B001", help="ID unik untuk identifikasi beasiswa")
             benua = st.selectbox("Benua *", ["Asia", "Eropa", "Amerika", "Afrika", "Oseania"])
-            asal_beasiswa = st.text_input("Asal Beasiswa *", placeholder="Contoh: Jepang")
-            nama_lembaga = st.text_input("Nama Lembaga *", placeholder="Contoh: MEXT")
         
         with col2:
-            top_univ = st.text_input("Top Universitas", placeholder="Contoh: University of Tokyo")
             program_beasiswa = st.selectbox("Program Beasiswa *", ["S1", "S2", "S3", "Non-Gelar"])
             jenis_beasiswa = st.selectbox("Jenis Beasiswa *", ["Fully Funded", "Partial", "Tuition Only"])
             waktu_pendaftaran = st.text_input("Waktu Pendaftaran", placeholder="Contoh: Januari - Februari")
@@ -499,6 +688,10 @@ elif menu == "➕ Tambah Data Manual":
                 new_data = [(id_beasiswa, benua, asal_beasiswa, nama_lembaga, top_univ, program_beasiswa, jenis_beasiswa, persyaratan, benefit, waktu_pendaftaran, link, current_time)]
                 insert_data(new_data)
                 st.success(f"Data Beasiswa {id_beasiswa} berhasil ditambahkan!")
+                mirip = find_duplicates_of(id_beasiswa)
+                if mirip:
+                    daftar = ", ".join(f"{id_lain} ({sim:.0%})" for id_lain, sim in mirip)
+                    st.warning(f"Data ini mirip dengan beasiswa yang sudah ada: {daftar}. Cek menu 🧬 Duplikat Data.")
                 st.balloons()
     
     st.markdown('</div>', unsafe_allow_html=True)
@@ -516,9 +709,9 @@ elif menu == "✏️ Edit Data":
         if not record.empty:
             values = record.values[0].tolist()
             benua = st.text_input("Benua", values[1])
-            asal = st.text_input("Asal Beasiswa", values[2])
-            lembaga = st.text_input("Nama Lembaga", values[3])
-            topuniv = st.text_input("Top Univ", values[4])
+            asal = typeahead_input("Asal Beasiswa", 'asal_beasiswa', key=f"edit_asal_{id_edit}", value=values[2])
+            lembaga = typeahead_input("Nama Lembaga", 'nama_lembaga', key=f"edit_lembaga_{id_edit}", value=values[3])
+            topuniv = typeahead_input("Top Univ", 'top_univ', key=f"edit_topuniv_{id_edit}", value=values[4])
             program = st.text_input("Program", values[5])
             jenis = st.text_input("Jenis", values[6])
             persyaratan = st.text_area("Persyaratan", values[7])
@@ -659,7 +852,7 @@ elif menu == "🔎 Filter Data":
     
     # Pencarian dengan fuzzy matching
     st.subheader("🔍 Pencarian Cerdas")
-    keyword = st.text_input("Masukkan kata kunci pencarian", placeholder="Cari berdasarkan nama lembaga, universitas, atau program")
+    keyword = typeahead_input("Masukkan kata kunci pencarian", 'nama_lembaga', key="cari_filter", placeholder="Cari berdasarkan nama lembaga, universitas, atau program")
     
     if keyword:
         # Mencocokkan dengan fuzzy matching
@@ -694,10 +887,158 @@ elif menu == "🔎 Filter Data":
     
     # Tampilkan hasil
     st.subheader(f"📋 Hasil Pencarian ({len(df_db)} beasiswa ditemukan)")
-    st.dataframe(df_db, use_container_width=True)
+    st.dataframe(add_link_badges(df_db), use_container_width=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# -------------------------
+# Pencocokan Profil
+# -------------------------
+elif menu == "🎯 Cocokkan Profil":
+    st.title("🎯 Cari Beasiswa yang Cocok dengan Profil Anda")
+    index = load_matching_index(data_version())
+
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+
+    with st.form("form_profil"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            jenjang = st.selectbox("Jenjang Tujuan", ["(Semua)"] + list(JENJANG))
+            benua_profil = st.multiselect("Benua Tujuan", sorted(index.benua_labels))
+            negara_profil = st.multiselect("Asal Beasiswa", sorted(index.negara_labels))
+        with col2:
+            ipk = st.number_input("IPK", min_value=0.0, max_value=4.0, value=None, step=0.01)
+            ielts = st.number_input("IELTS", min_value=0.0, max_value=9.0, value=None, step=0.5)
+            toefl = st.number_input("TOEFL iBT", min_value=0, max_value=120, value=None, step=1)
+        with col3:
+            usia = st.number_input("Usia", min_value=15, max_value=70, value=None, step=1)
+            top_k = st.slider("Jumlah hasil", 5, 100, 20)
+            hanya_memenuhi = st.checkbox("Hanya yang syaratnya terpenuhi", value=True)
+
+        minat = st.text_input("Bidang minat / kata kunci", placeholder="Contoh: teknik sipil, kesehatan masyarakat")
+        submitted = st.form_submit_button("🔍 Cari Beasiswa")
+
+    if submitted:
+        profil = {
+            'jenjang': None if jenjang == "(Semua)" else jenjang,
+            'benua': benua_profil,
+            'negara': negara_profil,
+            'ipk': ipk,
+            'ielts': ielts,
+            'toefl': toefl,
+            'usia': usia,
+            'minat': minat,
+        }
+        mulai = time.perf_counter()
+        hasil = index.score(profil, top_k=top_k, hanya_memenuhi=hanya_memenuhi)
+        durasi_ms = (time.perf_counter() - mulai) * 1000
+
+        if hasil.empty:
+            st.warning("Tidak ada beasiswa yang cocok dengan profil Anda.")
+        else:
+            conn = get_connection()
+            placeholders = ",".join("?" * len(hasil))
+            detail = pd.read_sql_query(f"SELECT * FROM beasiswa WHERE id IN ({placeholders})", conn, params=hasil['id'].tolist())
+            conn.close()
+            detail['id'] = detail['id'].astype(str)
+            hasil = hasil.merge(detail, on='id', how='left')
+            st.subheader(f"📋 {len(hasil)} beasiswa teratas dari {len(index)} data")
+            st.caption(f"Dihitung dalam {durasi_ms:.1f} ms")
+            st.dataframe(hasil, use_container_width=True)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# -------------------------
+# Deteksi & Penggabungan Duplikat
+# -------------------------
+elif menu == "🧬 Duplikat Data":
+    st.title("🧬 Deteksi Data Beasiswa Duplikat")
+
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+
+    threshold = st.slider("Ambang kemiripan", 0.5, 1.0, 0.8, 0.05)
+    col1, col2 = st.columns(2)
+    with col1:
+        cari = st.button("🔍 Cari Duplikat")
+    with col2:
+        if st.button("🔄 Bangun Ulang Indeks"):
+            conn = get_connection(write=True)
+            total = rebuild_index(conn)
+            conn.close()
+            after_write()
+            st.success(f"Indeks duplikat dibangun ulang untuk {total} data.")
+
+    if cari:
+        conn = get_connection()
+        st.session_state.duplicate_clusters = find_duplicate_clusters(conn, threshold)
+        conn.close()
+
+    clusters = st.session_state.get('duplicate_clusters')
+    if clusters is not None:
+        if not clusters:
+            st.success("Tidak ditemukan data duplikat.")
+        else:
+            st.info(f"Ditemukan {len(clusters)} kelompok kandidat duplikat")
+            df_db = fetch_data()
+            df_db['id'] = df_db['id'].astype(str)
+            for i, cluster in enumerate(clusters):
+                anggota = df_db[df_db['id'].isin(cluster['ids'])]
+                if len(anggota) < 2:
+                    continue
+                with st.expander(f"Kelompok {i + 1}: {len(anggota)} data (kemiripan {cluster['similarity']:.0%})"):
+                    st.dataframe(anggota, use_container_width=True)
+                    keep_id = st.radio("ID yang dipertahankan", anggota['id'].tolist(), key=f"keep_{i}", horizontal=True)
+                    if st.button("🔗 Gabungkan", key=f"merge_{i}"):
+                        merge_duplicates(keep_id, [x for x in anggota['id'] if x != keep_id])
+                        st.session_state.duplicate_clusters = [c for c in clusters if c is not cluster]
+                        st.success(f"Data digabung ke ID {keep_id}.")
+                        st.rerun()
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# -------------------------
+# Cek Status Link
+# -------------------------
+elif menu == "🩺 Cek Link":
+    st.title("🩺 Cek Status Link Beasiswa")
+
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        max_age = st.number_input("Cek ulang link yang terakhir dicek lebih dari (hari)", min_value=0, value=DEFAULT_MAX_AGE_DAYS)
+    with col2:
+        force = st.checkbox("Cek ulang semua link")
+
+    if st.button("🔄 Cek Link"):
+        progress_bar = st.progress(0.0, text="Memeriksa link...")
+        conn = get_connection(write=True)
+        hasil = refresh_link_status(conn, max_age, force, progress=lambda selesai, total: progress_bar.progress(selesai / total, text=f"Memeriksa link... {selesai}/{total}"))
+        conn.close()
+        if hasil:
+            after_write()
+        progress_bar.empty()
+        if hasil:
+            rusak = sum(1 for r in hasil if not r['ok'])
+            st.success(f"{len(hasil)} link dicek, {rusak} rusak.")
+        else:
+            st.info("Semua link masih baru dicek. Centang 'Cek ulang semua link' untuk memaksa pengecekan.")
+
+    conn = get_connection()
+    df_status = pd.read_sql_query("""
+        SELECT b.id, b.nama_lembaga, b.program_beasiswa, s.link, s.status_code, s.final_url, s.redirects, s.error, s.checked_at
+        FROM link_status s
+        JOIN beasiswa b ON TRIM(b.link) = s.link
+        WHERE s.ok = 0
+        ORDER BY s.checked_at DESC
+    """, conn)
+    conn.close()
+
+    st.subheader(f"❌ Link Rusak ({len(df_status)})")
+    st.dataframe(df_status, use_container_width=True)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
 # -------------------------
 # Download Data dengan Format Lebih Lengkap
 # -------------------------
@@ -753,28 +1094,155 @@ elif menu == "📥 Download Data":
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# -------------------------
+# Digest Deadline (email pelanggan)
+# -------------------------
+elif menu == "📧 Digest Deadline":
+    st.title("📧 Digest Beasiswa yang Akan Ditutup")
+
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+
+    digest = check_closing_scholarships()
+    df_db = fetch_data()
+    daftar_benua = sorted(df_db['benua'].dropna().unique())
+    daftar_program = sorted(df_db['program_beasiswa'].dropna().unique())
+
+    st.subheader("👥 Pelanggan")
+    with st.form("form_pelanggan", clear_on_submit=True):
+        col1, col2 = st.columns(2)
+        with col1:
+            email = st.text_input("Email")
+            nama = st.text_input("Nama")
+        with col2:
+            benua = st.multiselect("Benua (kosong = semua)", daftar_benua)
+            program = st.multiselect("Program (kosong = semua)", daftar_program)
+        if st.form_submit_button("➕ Tambah Pelanggan"):
+            if "@" not in email:
+                st.error("Email tidak valid")
+            else:
+                conn = get_connection(write=True)
+                add_subscriber(conn, email, nama, benua, program)
+                conn.close()
+                st.success(f"{email} ditambahkan sebagai pelanggan digest.")
+
+    conn = get_connection()
+    pelanggan = list_subscribers(conn)
+    conn.close()
+    st.dataframe(pelanggan, use_container_width=True)
+    if not pelanggan.empty:
+        hapus = st.selectbox("Hapus pelanggan", pelanggan['email'].tolist())
+        if st.button("🗑️ Hapus Pelanggan"):
+            conn = get_connection(write=True)
+            remove_subscriber(conn, hapus)
+            conn.close()
+            st.rerun()
+
+    st.subheader(f"📨 Kirim Digest ({len(digest)} beasiswa)")
+    col1, col2 = st.columns(2)
+    with col1:
+        sender_name = st.selectbox("Pengirim", list(SENDERS), index=list(SENDERS).index(DIGEST_SENDER))
+    with col2:
+        force = st.checkbox("Kirim ulang walaupun sudah terkirim hari ini")
+    if st.button("📤 Kirim Digest"):
+        conn = get_connection(write=True)
+        try:
+            terkirim = send_digest(conn, digest, get_sender(sender_name), DIGEST_FROM, force=force)
+            st.success(f"Digest dikirim ke {terkirim} pelanggan.")
+        except OSError as e:
+            st.error(f"Gagal mengirim digest: {e}")
+        finally:
+            conn.close()
+
+    with st.expander("👀 Pratinjau digest"):
+        st.markdown(render_html(digest) if not digest.empty else "Tidak ada beasiswa yang akan segera ditutup.", unsafe_allow_html=True)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
 # -------------------------
 # Reset Database
 # -------------------------
 elif menu == "⚠️ Reset Database":
     st.title("⚠️ Reset Seluruh Database Beasiswa")
 
-    st.warning("PERINGATAN: Tindakan ini akan menghapus **SELURUH data beasiswa** secara permanen. Harap berhati-hati!")
+    st.warning(f"PERINGATAN: Tindakan ini akan mengosongkan **SELURUH data beasiswa**. Data lama disimpan sebagai snapshot dan dapat dipulihkan dari menu 💾 Backup & Restore ({BACKUP_KEEP} snapshot terakhir).")
 
     kode_verifikasi = st.text_input("Masukkan kode verifikasi admin untuk melanjutkan (ketik: 6464):", type="password")
 
     if kode_verifikasi == "6464":
         if st.button("🚨 Hapus Semua Data"):
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM beasiswa")
-            conn.commit()
+            conn = get_connection(write=True)
+            info = swap_reset(conn)
+            reset_derived_tables(conn)
             conn.close()
-            st.success("✅ Semua data telah berhasil dihapus!")
+            load_typeahead_index.clear()
+            matching_index_cache().clear()
+            after_write()
+            st.success(f"✅ Semua data telah berhasil dihapus! {info['rows']} data disimpan sebagai snapshot `{info['name']}` dalam {info['duration'] * 1000:.1f} ms.")
             st.balloons()
     elif kode_verifikasi != "":
         st.error("❌ Kode verifikasi salah. Silakan coba lagi.")
 
+# -------------------------
+# Backup & Restore
+# -------------------------
+elif menu == "💾 Backup & Restore":
+    st.title("💾 Backup & Restore Database")
+
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+
+    st.subheader("📸 Snapshot Reset")
+    conn = get_connection()
+    table_snapshots = list_table_snapshots(conn)
+    conn.close()
+    if table_snapshots:
+        df_snap = pd.DataFrame(table_snapshots)
+        df_snap['size'] = (pd.to_numeric(df_snap['size']) / 1024).round(1)
+        df_snap['duration'] = (df_snap['duration'] * 1000).round(1)
+        st.dataframe(df_snap.rename(columns={'name': 'Snapshot', 'label': 'Keterangan', 'rows': 'Jumlah Data', 'size': 'Ukuran (KB)', 'duration': 'Durasi (ms)', 'created_at': 'Dibuat'}), use_container_width=True)
+        pilihan_snap = st.selectbox("Pilih snapshot", [s['name'] for s in table_snapshots])
+        if st.button("♻️ Pulihkan Snapshot"):
+            conn = get_connection(write=True)
+            durasi = restore_table_snapshot(conn, pilihan_snap)
+            reset_derived_tables(conn)
+            rebuild_index(conn)
+            conn.close()
+            load_typeahead_index.clear()
+            matching_index_cache().clear()
+            after_write()
+            st.success(f"Snapshot {pilihan_snap} dipulihkan dalam {durasi * 1000:.1f} ms. Data sebelumnya disimpan sebagai snapshot baru.")
+    else:
+        st.info("Belum ada snapshot. Snapshot dibuat otomatis saat database di-reset.")
+
+    st.markdown("---")
+    st.subheader("🗄️ Backup File")
+    if st.button("📦 Buat Backup Sekarang"):
+        conn = get_connection()
+        info = create_backup(conn, label="manual")
+        conn.close()
+        st.success(f"Backup {info['name']} ({info['size'] / 1024:.1f} KB) dibuat dalam {info['duration']:.2f} detik.")
+
+    backups = list_backups()
+    if backups:
+        df_backup = pd.DataFrame(backups)
+        df_backup['size'] = (df_backup['size'] / 1024).round(1)
+        st.dataframe(df_backup.rename(columns={'name': 'File', 'label': 'Keterangan', 'created_at': 'Dibuat', 'size': 'Ukuran (KB)', 'duration': 'Durasi (detik)'}), use_container_width=True)
+        pilihan_backup = st.selectbox("Pilih backup", [b['name'] for b in backups])
+        if st.button("♻️ Pulihkan Backup"):
+            conn = get_connection(write=True)
+            # Kondisi sekarang dibackup dulu agar restore dapat dibatalkan
+            create_backup(conn, label="sebelum-restore", keep=None)
+            durasi = restore_backup(conn, pilihan_backup)
+            prune_backups()
+            conn.close()
+            load_typeahead_index.clear()
+            matching_index_cache().clear()
+            after_write()
+            st.success(f"Backup {pilihan_backup} dipulihkan dalam {durasi:.2f} detik.")
+    else:
+        st.info("Belum ada backup file.")
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
 # -------------------------
 # Integrasi API
 # -------------------------
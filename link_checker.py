@@ -0,0 +1,205 @@
+import argparse
+import asyncio
+import os
+import sqlite3
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+import aiohttp
+
+# -------------------------
+# Parameter pemeriksaan link
+# -------------------------
+DEFAULT_CONCURRENCY = 20
+DEFAULT_PER_HOST = 2
+DEFAULT_HOST_INTERVAL = 0.5  # jeda minimum (detik) antar request ke host yang sama
+DEFAULT_TIMEOUT = 10
+DEFAULT_MAX_AGE_DAYS = 7
+MAX_REDIRECTS = 10
+# Status HEAD yang sering berarti "HEAD tidak didukung", dicoba ulang dengan GET
+_HEAD_FALLBACK_STATUS = {400, 403, 404, 405, 406, 429, 500, 501, 503}
+_USER_AGENT = "Mozilla/5.0 (compatible; PortalBeasiswaLinkChecker/1.0)"
+
+
+# -------------------------
+# Tabel link_status
+# -------------------------
+def ensure_link_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS link_status (
+            link TEXT PRIMARY KEY,
+            status_code INTEGER,
+            ok INTEGER,
+            final_url TEXT,
+            redirects INTEGER,
+            method TEXT,
+            error TEXT,
+            checked_at TEXT
+        )
+    """)
+
+
+def stale_links(conn, max_age_days=DEFAULT_MAX_AGE_DAYS, force=False):
+    # Link yang belum pernah dicek atau hasil ceknya sudah lebih lama dari max_age_days
+    ensure_link_table(conn)
+    batas = (datetime.now() - timedelta(days=max_age_days)).strftime("%Y-%m-%d %H:%M:%S")
+    query = """
+        SELECT DISTINCT TRIM(b.link)
+        FROM beasiswa b
+        LEFT JOIN link_status s ON s.link = TRIM(b.link)
+        WHERE b.link IS NOT NULL AND TRIM(b.link) NOT IN ('', '-')
+    """
+    if force:
+        return [row[0] for row in conn.execute(query)]
+    query += " AND (s.link IS NULL OR s.checked_at < ?)"
+    return [row[0] for row in conn.execute(query, (batas,))]
+
+
+def save_results(conn, results):
+    ensure_link_table(conn)
+    conn.executemany("""
+        INSERT OR REPLACE INTO link_status
+        (link, status_code, ok, final_url, redirects, method, error, checked_at)
+        VALUES (:link, :status_code, :ok, :final_url, :redirects, :method, :error, :checked_at)
+    """, results)
+    conn.commit()
+
+
+def link_status_map(conn):
+    ensure_link_table(conn)
+    return {row[0]: row[1:] for row in conn.execute(
+        "SELECT link, ok, status_code, redirects, error FROM link_status")}
+
+
+def link_badge(status):
+    if status is None:
+        return "❔ Belum dicek"
+    ok, status_code, redirects, error = status
+    if ok:
+        return "↪️ Dialihkan" if redirects else "✅ Aktif"
+    if status_code:
+        return f"❌ Rusak ({status_code})"
+    return f"⚠️ {error or 'Gagal'}"
+
+
+# -------------------------
+# Klien HTTP asinkron dengan batas konkurensi per host
+# -------------------------
+class HostRateLimiter:
+    def __init__(self, per_host=DEFAULT_PER_HOST, interval=DEFAULT_HOST_INTERVAL):
+        self.interval = interval
+        self._slots = defaultdict(lambda: asyncio.Semaphore(per_host))
+        self._locks = defaultdict(asyncio.Lock)
+        self._next_time = defaultdict(float)
+
+    @asynccontextmanager
+    async def slot(self, host):
+        async with self._slots[host]:
+            async with self._locks[host]:
+                loop = asyncio.get_running_loop()
+                tunggu = self._next_time[host] - loop.time()
+                if tunggu > 0:
+                    await asyncio.sleep(tunggu)
+                self._next_time[host] = loop.time() + self.interval
+            yield
+
+
+async def _request(session, method, url):
+    async with session.request(method, url, allow_redirects=True, max_redirects=MAX_REDIRECTS) as resp:
+        return resp.status, str(resp.url), len(resp.history)
+
+
+async def check_link(session, limiter, url):
+    hasil = {
+        'link': url, 'status_code': None, 'ok': 0, 'final_url': None,
+        'redirects': 0, 'method': None, 'error': None,
+        'checked_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    host = urlsplit(url).hostname
+    if urlsplit(url).scheme not in ('http', 'https') or not host:
+        hasil['error'] = "URL tidak valid"
+        return hasil
+
+    for method in ('HEAD', 'GET'):
+        hasil['method'] = method
+        try:
+            async with limiter.slot(host):
+                status, final_url, redirects = await _request(session, method, url)
+        except aiohttp.TooManyRedirects:
+            hasil.update(status_code=None, error="Terlalu banyak redirect")
+            break
+        except asyncio.TimeoutError:
+            hasil.update(status_code=None, error="Timeout")
+            continue
+        except aiohttp.ClientError as e:
+            hasil.update(status_code=None, error=type(e).__name__)
+            continue
+        hasil.update(status_code=status, final_url=final_url, redirects=redirects,
+                     ok=int(status < 400), error=None)
+        if method == 'GET' or status not in _HEAD_FALLBACK_STATUS:
+            break
+    return hasil
+
+
+async def check_links(urls, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                      host_interval=DEFAULT_HOST_INTERVAL, timeout=DEFAULT_TIMEOUT, progress=None):
+    limiter = HostRateLimiter(per_host, host_interval)
+    slots = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    selesai = 0
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                     headers={"User-Agent": _USER_AGENT}) as session:
+        async def _satu(url):
+            nonlocal selesai
+            async with slots:
+                hasil = await check_link(session, limiter, url)
+            selesai += 1
+            if progress:
+                progress(selesai, len(urls))
+            return hasil
+
+        return await asyncio.gather(*(_satu(url) for url in urls))
+
+
+def refresh_link_status(conn, max_age_days=DEFAULT_MAX_AGE_DAYS, force=False, progress=None, **kwargs):
+    urls = stale_links(conn, max_age_days, force)
+    if not urls:
+        return []
+    results = asyncio.run(check_links(urls, progress=progress, **kwargs))
+    save_results(conn, results)
+    return results
+
+
+# -------------------------
+# Mode batch (CLI)
+# -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cek status kolom link pada data beasiswa")
+    parser.add_argument("--db", default=os.environ.get("BEASISWA_DB", "beasiswa.db"), help="Path database SQLite")
+    parser.add_argument("--max-age-days", type=float, default=DEFAULT_MAX_AGE_DAYS,
+                        help="Cek ulang link yang hasilnya lebih lama dari ini")
+    parser.add_argument("--force", action="store_true", help="Cek ulang semua link")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST)
+    parser.add_argument("--host-interval", type=float, default=DEFAULT_HOST_INTERVAL)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        results = refresh_link_status(conn, args.max_age_days, args.force,
+                                      concurrency=args.concurrency, per_host=args.per_host,
+                                      host_interval=args.host_interval, timeout=args.timeout)
+    finally:
+        conn.close()
+    rusak = [r for r in results if not r['ok']]
+    print(f"{len(results)} link dicek, {len(rusak)} rusak")
+    for r in rusak:
+        print(f"  {r['link']}: {r['status_code'] or r['error']}")
+
+
+if __name__ == "__main__":
+    main()
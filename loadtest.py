@@ -0,0 +1,365 @@
+import argparse
+import json
+import os
+import random
+import resource
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# -------------------------
+# Uji beban sesi Streamlit secara headless (AppTest)
+# -------------------------
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "input_beasiswa.py")
+DEFAULT_LEVELS = "1,2,4,8"
+DEFAULT_ROWS = 100_000
+DEFAULT_ACTIONS = 20
+BUSY_TIMEOUT = 5.0  # sama dengan default timeout sqlite3.connect
+
+# Bobot aksi: kebanyakan sesi membaca, sebagian kecil menulis.
+# AppTest belum bisa mengisi st.file_uploader, jadi jalur upload diwakili 'insert' (sama-sama lewat insert_data)
+ACTIONS = {
+    'dashboard': 25,
+    'filter': 20,
+    'fuzzy_search': 20,
+    'export': 10,
+    'match': 10,
+    'insert': 10,
+    'edit': 5,
+}
+
+_BENUA = ['ASIA', 'EROPA', 'AMERIKA', 'AFRIKA', 'OSEANIA']
+_NEGARA = ['Jepang', 'Korea Selatan', 'Jerman', 'Belanda', 'Inggris', 'Amerika Serikat', 'Australia', 'Tiongkok', 'Turki', 'Prancis']
+_LEMBAGA = ['MEXT', 'KGSP', 'DAAD', 'Chevening', 'Fulbright', 'Australia Awards', 'CSC', 'Turkiye Burslari', 'Erasmus Mundus', 'LPDP']
+_JENJANG = ['S1', 'S2', 'S3', 'S1/S2/S3', 'S2/S3', 'Non-Gelar']
+_KATA_KUNCI = ['mext', 'daad', 'chevening', 'fulbright', 'erasmus', 'lpdp', 'korea', 'awards']
+
+
+# -------------------------
+# Database sintetis berukuran besar
+# -------------------------
+def generate_database(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    lembaga = rng.choice(_LEMBAGA, rows)
+    df = pd.DataFrame({
+        'id': [f"L{i}" for i in range(rows)],
+        'benua': rng.choice(_BENUA, rows),
+        'asal_beasiswa': rng.choice(_NEGARA, rows),
+        'nama_lembaga': lembaga + ' ' + rng.integers(1, 500, rows).astype(str),
+        'top_univ': rng.choice(['University of Tokyo', 'TU Munich', 'Oxford', 'Harvard', 'ANU', '-'], rows),
+        'program_beasiswa': lembaga + ' Scholarship',
+        'jenis_beasiswa': rng.choice(_JENJANG, rows),
+        'persyaratan': ['IPK minimal %.2f, IELTS %.1f' % (ipk, ielts) for ipk, ielts in
+                        zip(rng.choice([2.75, 3.0, 3.25, 3.5], rows), rng.choice([5.5, 6.0, 6.5, 7.0], rows))],
+        'benefit': rng.choice(['Beasiswa penuh', 'Biaya kuliah', 'Tunjangan hidup dan tiket pesawat'], rows),
+        'waktu_pendaftaran': rng.choice(['Januari - Februari', 'Maret - April', 'September - Oktober', None], rows),
+        'link': [f"https://example.org/beasiswa/{i}" for i in range(rows)],
+        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    })
+    conn = sqlite3.connect(path)
+    df.to_sql('beasiswa', conn, if_exists='replace', index=False, chunksize=10_000)
+    conn.close()
+
+
+# -------------------------
+# Instrumentasi SQLite: hitung tunggu lock secara eksplisit
+# -------------------------
+class LockStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.lock_waits = 0
+        self.lock_wait_time = 0.0
+        self.lock_errors = 0
+
+    def record_wait(self, durasi, gagal):
+        with self._lock:
+            self.lock_waits += 1
+            self.lock_wait_time += durasi
+            self.lock_errors += int(gagal)
+
+
+STATS = LockStats()
+
+
+def _with_busy_retry(fn, *args):
+    # Koneksi dibuka dengan timeout=0 sehingga setiap tunggu lock terlihat dan bisa dihitung
+    mulai = None
+    while True:
+        try:
+            hasil = fn(*args)
+            if mulai is not None:
+                STATS.record_wait(time.perf_counter() - mulai, gagal=False)
+            return hasil
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e) and 'busy' not in str(e):
+                raise
+            if mulai is None:
+                mulai = time.perf_counter()
+            elif time.perf_counter() - mulai > BUSY_TIMEOUT:
+                STATS.record_wait(time.perf_counter() - mulai, gagal=True)
+                raise
+            time.sleep(0.002)
+
+
+class _CountingCursor(sqlite3.Cursor):
+    def execute(self, *args):
+        return _with_busy_retry(super().execute, *args)
+
+    def executemany(self, *args):
+        return _with_busy_retry(super().executemany, *args)
+
+
+class _CountingConnection(sqlite3.Connection):
+    def cursor(self, factory=_CountingCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def commit(self):
+        return _with_busy_retry(super().commit)
+
+
+def install_sqlite_instrumentation():
+    asli = sqlite3.connect
+
+    def connect(*args, **kwargs):
+        kwargs.setdefault('factory', _CountingConnection)
+        kwargs['timeout'] = 0
+        kwargs.setdefault('check_same_thread', False)
+        return asli(*args, **kwargs)
+
+    sqlite3.connect = connect
+
+
+# -------------------------
+# Memori proses
+# -------------------------
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemorySampler(threading.Thread):
+    def __init__(self, interval=0.2):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = _rss_bytes()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return max(self.peak, _rss_bytes())
+
+
+# -------------------------
+# Sesi simulasi
+# -------------------------
+def _by_label(widgets, label):
+    for w in widgets:
+        if w.label == label:
+            return w
+    raise LookupError(f"Widget '{label}' tidak ditemukan")
+
+
+class SimulatedSession:
+    def __init__(self, user, password, rows, rng, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.rows = rows
+        self.user = user
+        self.password = password
+        self.rng = rng
+        self.latencies = defaultdict(list)
+        self.errors = []
+
+    def _run(self, aksi, widget=None):
+        mulai = time.perf_counter()
+        if widget is None:
+            self.at.run()
+        else:
+            widget.run()
+        self.latencies[aksi].append(time.perf_counter() - mulai)
+        for exc in self.at.exception:
+            self.errors.append(f"{aksi}: {exc.value}")
+
+    def _navigate(self, aksi, menu):
+        self._run(aksi, self.at.sidebar.selectbox[0].select(menu))
+
+    def open(self):
+        # Run pertama mengompilasi skrip; ast.parse tidak aman dijalankan paralel di beberapa thread
+        self._run('login')
+
+    def login(self):
+        _by_label(self.at.text_input, "Username").input(self.user)
+        _by_label(self.at.text_input, "Password").input(self.password)
+        self._run('login', _by_label(self.at.button, "Login").click())
+        if not self.at.session_state["logged_in"]:
+            raise RuntimeError("Login gagal, periksa --user/--password")
+
+    def dashboard(self):
+        self._navigate('dashboard', "🏠 Dashboard")
+
+    def filter(self):
+        self._navigate('filter', "🔎 Filter Data")
+        benua = _by_label(self.at.multiselect, "Benua")
+        if benua.options:
+            self._run('filter', benua.select(self.rng.choice(benua.options)))
+
+    def fuzzy_search(self):
+        self._navigate('fuzzy_search', "📄 Data Tersimpan")
+        keyword = self.rng.choice(_KATA_KUNCI)
+        self._run('fuzzy_search', _by_label(self.at.text_input, "Masukkan kata kunci pencarian").input(keyword))
+
+    def export(self):
+        self._navigate('export', "📥 Download Data")
+
+    def match(self):
+        self._navigate('match', "🎯 Cocokkan Profil")
+        _by_label(self.at.text_input, "Bidang minat / kata kunci").input(self.rng.choice(_KATA_KUNCI))
+        self._run('match', _by_label(self.at.button, "🔍 Cari Beasiswa").click())
+
+    def insert(self):
+        self._navigate('insert', "➕ Tambah Data Manual")
+        id_baru = f"LT{threading.get_ident()}-{self.rng.randrange(10**9)}"
+        isian = {
+            "Asal Beasiswa *": self.rng.choice(_NEGARA),
+            "Nama Lembaga *": self.rng.choice(_LEMBAGA),
+            "ID Beasiswa *": id_baru,
+            "Persyaratan *": "IPK minimal 3.0",
+            "Benefit *": "Beasiswa penuh",
+            "Link Informasi *": f"https://example.org/loadtest/{id_baru}",
+        }
+        for label, nilai in isian.items():
+            widgets = self.at.text_area if label in ("Persyaratan *", "Benefit *") else self.at.text_input
+            _by_label(widgets, label).input(nilai)
+        self._run('insert', _by_label(self.at.button, "💾 Simpan Data").click())
+
+    def edit(self):
+        self._navigate('edit', "✏️ Edit Data")
+        id_edit = f"L{self.rng.randrange(self.rows)}"
+        self._run('edit', _by_label(self.at.text_input, "Masukkan ID Beasiswa yang akan diedit:").input(id_edit))
+        if any(b.label == "💾 Update" for b in self.at.button):
+            _by_label(self.at.text_area, "Benefit").input(f"Beasiswa penuh (diubah {time.time():.0f})")
+            self._run('edit', _by_label(self.at.button, "💾 Update").click())
+
+    def play(self, n_actions):
+        self.login()
+        nama = list(ACTIONS)
+        bobot = [ACTIONS[a] for a in nama]
+        for aksi in self.rng.choices(nama, weights=bobot, k=n_actions):
+            try:
+                getattr(self, aksi)()
+            except Exception as e:
+                self.errors.append(f"{aksi}: {type(e).__name__}: {e}")
+
+
+# -------------------------
+# Menjalankan satu tingkat konkurensi
+# -------------------------
+def run_level(concurrency, n_actions, rows, user, password, timeout, seed):
+    STATS.reset()
+    sessions = [SimulatedSession(user, password, rows, random.Random(seed + i), timeout) for i in range(concurrency)]
+    rss_awal = _rss_bytes()
+    for s in sessions:
+        s.open()
+    sampler = MemorySampler()
+    sampler.start()
+    mulai = time.perf_counter()
+    threads = [threading.Thread(target=s.play, args=(n_actions,)) for s in sessions]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    durasi = time.perf_counter() - mulai
+    rss_puncak = sampler.stop()
+
+    latencies = np.array([x for s in sessions for xs in s.latencies.values() for x in xs]) * 1000
+    per_aksi = defaultdict(list)
+    for s in sessions:
+        for aksi, xs in s.latencies.items():
+            per_aksi[aksi].extend(xs)
+    errors = [e for s in sessions for e in s.errors]
+    return {
+        'concurrency': concurrency,
+        'reruns': len(latencies),
+        'duration_s': durasi,
+        'throughput_rps': len(latencies) / durasi if durasi else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+        'p95_ms': float(np.percentile(latencies, 95)) if len(latencies) else None,
+        'p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else None,
+        'lock_waits': STATS.lock_waits,
+        'lock_wait_s': STATS.lock_wait_time,
+        'lock_errors': STATS.lock_errors,
+        'errors': len(errors),
+        'mem_per_session_mb': max(rss_puncak - rss_awal, 0) / concurrency / 2**20,
+        'per_action_p95_ms': {a: float(np.percentile(np.array(xs) * 1000, 95)) for a, xs in per_aksi.items()},
+        'error_samples': errors[:5],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban sesi bersamaan untuk aplikasi Portal Beasiswa")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Jumlah baris database sintetis")
+    parser.add_argument("--levels", default=DEFAULT_LEVELS, help="Tingkat konkurensi, dipisah koma")
+    parser.add_argument("--actions", type=int, default=DEFAULT_ACTIONS, help="Jumlah aksi per sesi")
+    parser.add_argument("--workdir", help="Direktori kerja (default: direktori sementara)")
+    parser.add_argument("--db", help="Pakai database yang sudah ada alih-alih membuat database sintetis")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--timeout", type=float, default=300, help="Batas waktu satu rerun (detik)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Simpan hasil lengkap ke file JSON")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="beasiswa-loadtest-")
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.abspath(args.db) if args.db else os.path.join(workdir, "beasiswa.db")
+    if not args.db:
+        print(f"Membuat database sintetis {args.rows} baris di {db_path} ...")
+        generate_database(db_path, args.rows, args.seed)
+    rows = pd.read_sql_query("SELECT count(*) AS n FROM beasiswa", sqlite3.connect(db_path))['n'][0]
+
+    # Aplikasi membaca konfigurasi dari environment saat pertama kali diimpor
+    os.environ["BEASISWA_DB"] = db_path
+    os.environ.setdefault("BEASISWA_BACKUP_DIR", os.path.join(workdir, "backups"))
+    os.chdir(workdir)
+    install_sqlite_instrumentation()
+
+    hasil = []
+    for level in [int(x) for x in args.levels.split(",") if x.strip()]:
+        print(f"Menjalankan {level} sesi x {args.actions} aksi ...")
+        hasil.append(run_level(level, args.actions, rows, args.user, args.password, args.timeout, args.seed))
+
+    kolom = ['concurrency', 'reruns', 'throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms',
+             'lock_waits', 'lock_wait_s', 'lock_errors', 'errors', 'mem_per_session_mb']
+    print(pd.DataFrame(hasil)[kolom].round(2).to_string(index=False))
+    for h in hasil:
+        for contoh in h['error_samples']:
+            print(f"  [{h['concurrency']} sesi] {contoh}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(hasil, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+import re
+import threading
+from collections import Counter
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# -------------------------
+# Ekstraksi persyaratan terstruktur dari teks persyaratan & benefit
+# -------------------------
+FITUR_KOLOM = ['min_ipk', 'min_ielts', 'min_toefl', 'max_usia']
+FITUR_VERSI = 2  # naikkan setiap aturan ekstraksi berubah
+
+_ANGKA = r'(\d+(?:[.,]\d+)?)'
+_POLA_FITUR = {
+    'min_ipk': re.compile(r'\b(?:ipk|gpa)\b\D{0,25}?' + _ANGKA, re.I),
+    'min_ielts': re.compile(r'\bielts\b\D{0,25}?' + _ANGKA, re.I),
+    'min_toefl': re.compile(r'\btoefl\b\D{0,25}?' + _ANGKA, re.I),
+}
+# Batas usia: kalimat setelah kata usia/umur/age, yang diambil batas atasnya
+_POLA_USIA = re.compile(r'\b(?:(?:ber)?usia|(?:ber)?umur|age[ds]?)\b((?:[^.;\n]|\.(?=\S|\s*\d)){0,80})', re.I)
+_BATAS_ATAS = r'(?:maks(?:imal|imum)?\.?|max(?:imum)?\.?|di ?bawah|kurang dari|tidak lebih dari|paling tinggi|paling tua|under|below|up to|not (?:older|more) than)'
+_BATAS_BAWAH = r'(?:min(?:imal|imum)?\.?|di ?atas|lebih dari|paling rendah|paling muda|at least|over|above)'
+_USIA_RENTANG = re.compile(r'(\d{2})\s*(?:tahun|thn|years?)?\s*(?:-|–|s\.?\s?d\.?|sampai(?: dengan)?|hingga|to|and)\s*(\d{2})\b', re.I)
+_USIA_MAKS = re.compile(_BATAS_ATAS + r'\s*(?:usia\s*)?(\d{2})\b', re.I)
+_USIA_MIN = re.compile(_BATAS_BAWAH + r'\s*(?:usia\s*)?(\d{2})\b', re.I)
+_USIA_ANGKA = re.compile(r'(\d{2})\b')
+# "maksimal 35 tahun" tanpa kata usia/umur
+_POLA_USIA_TAHUN = re.compile(r'\b' + _BATAS_ATAS + r'\s*(\d{2})\s*(?:tahun|years)', re.I)
+# Batas wajar tiap fitur, nilai di luar batas dianggap salah baca
+_RENTANG_FITUR = {
+    'min_ipk': (0.0, 4.0),
+    'min_ielts': (0.0, 9.0),
+    'min_toefl': (0.0, 677.0),
+    'max_usia': (15.0, 70.0),
+}
+# Konversi kasar TOEFL PBT -> iBT supaya semua nilai TOEFL satu skala
+_TOEFL_PBT = [310, 400, 450, 500, 550, 600, 677]
+_TOEFL_IBT = [0, 32, 45, 61, 80, 100, 120]
+
+
+def _ke_angka(teks):
+    try:
+        return float(teks.replace(',', '.'))
+    except ValueError:
+        return None
+
+
+def _gabung_teks(*nilai):
+    return ' '.join(str(v) for v in nilai if v is not None and pd.notna(v))
+
+
+def _batas_usia(teks):
+    # "18-35 tahun", "minimal 18 dan maksimal 35", "antara 20 hingga 40" -> batas atas;
+    # "minimal 18 tahun" saja tidak punya batas atas
+    batas_bawah, batas_atas = _RENTANG_FITUR['max_usia']
+    for match in _POLA_USIA.finditer(teks):
+        kalimat = match.group(1)
+        for pola, grup in ((_USIA_RENTANG, 2), (_USIA_MAKS, 1)):
+            hasil = pola.search(kalimat)
+            if hasil and batas_bawah < float(hasil.group(grup)) <= batas_atas:
+                return float(hasil.group(grup))
+        angka = _USIA_ANGKA.search(kalimat)
+        if angka and not _USIA_MIN.search(kalimat) and batas_bawah < float(angka.group(1)) <= batas_atas:
+            return float(angka.group(1))
+    match = _POLA_USIA_TAHUN.search(teks)
+    return float(match.group(1)) if match else None
+
+
+def extract_requirements(persyaratan, benefit=None):
+    teks = _gabung_teks(persyaratan, benefit)
+    fitur = dict.fromkeys(FITUR_KOLOM)
+    for kolom, pola in _POLA_FITUR.items():
+        for match in pola.finditer(teks):
+            nilai = _ke_angka(match.group(1))
+            batas_bawah, batas_atas = _RENTANG_FITUR[kolom]
+            if nilai is not None and batas_bawah < nilai <= batas_atas:
+                fitur[kolom] = nilai
+                break
+    fitur['max_usia'] = _batas_usia(teks)
+    if fitur['min_toefl'] is not None and fitur['min_toefl'] > 120:
+        fitur['min_toefl'] = float(np.interp(fitur['min_toefl'], _TOEFL_PBT, _TOEFL_IBT))
+    return fitur
+
+
+# -------------------------
+# Penyimpanan fitur saat data ditulis
+# -------------------------
+def ensure_feature_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS beasiswa_fitur (
+            id TEXT PRIMARY KEY,
+            min_ipk REAL,
+            min_ielts REAL,
+            min_toefl REAL,
+            max_usia REAL
+        )
+    """)
+    # Fitur hasil versi ekstraktor lama dibuang agar diekstrak ulang oleh build_matching_index
+    if _fitur_kedaluwarsa(conn):
+        conn.execute("CREATE TABLE IF NOT EXISTS beasiswa_fitur_versi (versi INTEGER)")
+        conn.execute("DELETE FROM beasiswa_fitur")
+        conn.execute("DELETE FROM beasiswa_fitur_versi")
+        conn.execute("INSERT INTO beasiswa_fitur_versi (versi) VALUES (?)", (FITUR_VERSI,))
+
+
+def _fitur_kedaluwarsa(conn):
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'beasiswa_fitur_versi'").fetchone():
+        return True
+    return conn.execute("SELECT max(versi) FROM beasiswa_fitur_versi").fetchone()[0] != FITUR_VERSI
+
+
+def save_requirements(conn, rows, replace=False):
+    # rows: iterable berisi (id, persyaratan, benefit)
+    ensure_feature_table(conn)
+    data = []
+    for id_value, persyaratan, benefit in rows:
+        fitur = extract_requirements(persyaratan, benefit)
+        data.append((str(id_value),) + tuple(fitur[k] for k in FITUR_KOLOM))
+    aksi = "REPLACE" if replace else "IGNORE"
+    conn.executemany(f"""
+        INSERT OR {aksi} INTO beasiswa_fitur (id, min_ipk, min_ielts, min_toefl, max_usia)
+        VALUES (?, ?, ?, ?, ?)
+    """, data)
+
+
+def delete_requirements(conn, id_value):
+    ensure_feature_table(conn)
+    conn.execute("DELETE FROM beasiswa_fitur WHERE id = ?", (id_value,))
+
+
+# -------------------------
+# TF-IDF sederhana berbasis scipy.sparse
+# -------------------------
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def _tokenize(teks):
+    return _TOKEN.findall(teks.lower())
+
+
+def _build_tfidf(texts):
+    vocab = {}
+    indptr = [0]
+    indices = []
+    counts = []
+    for teks in texts:
+        for token, jumlah in Counter(_tokenize(teks)).items():
+            indices.append(vocab.setdefault(token, len(vocab)))
+            counts.append(jumlah)
+        indptr.append(len(indices))
+
+    n_dok = len(indptr) - 1
+    tf = sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.float32),
+         np.asarray(indices, dtype=np.int32),
+         np.asarray(indptr, dtype=np.int64)),
+        shape=(n_dok, len(vocab)),
+    )
+    df_token = np.bincount(tf.indices, minlength=len(vocab))
+    idf = (np.log((1 + n_dok) / (1 + df_token)) + 1).astype(np.float32)
+
+    tf.data = 1 + np.log(tf.data)
+    tfidf = (tf @ sparse.diags(idf)).tocsr()
+    norm = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norm[norm == 0] = 1
+    tfidf = (sparse.diags(1 / norm) @ tfidf).tocsr().astype(np.float32)
+    return tfidf, vocab, idf
+
+
+# -------------------------
+# Jenjang studi sebagai bitmask (program_beasiswa & jenis_beasiswa)
+# -------------------------
+JENJANG = {
+    'Non-Gelar': re.compile(r'non[- ]?gelar|non[- ]?degree|diploma|short course|kursus|training', re.I),
+    'S1': re.compile(r'\bs1\b|sarjana|bachelor|undergrad', re.I),
+    'S2': re.compile(r'\bs2\b|magister|master|postgrad|pascasarjana', re.I),
+    'S3': re.compile(r'\bs3\b|doktor|doctor|ph\.?d', re.I),
+}
+_BIT_JENJANG = {nama: 1 << i for i, nama in enumerate(JENJANG)}
+
+
+def _jenjang_mask(series):
+    teks = series.fillna('').astype(str)
+    mask = np.zeros(len(teks), dtype=np.int8)
+    for nama, pola in JENJANG.items():
+        mask |= np.where(teks.str.contains(pola), _BIT_JENJANG[nama], 0).astype(np.int8)
+    return mask
+
+
+# -------------------------
+# Indeks pencocokan profil
+# -------------------------
+BOBOT_TEKS = 1.0
+BOBOT_JENJANG = 0.6
+BOBOT_NEGARA = 0.4
+BOBOT_BENUA = 0.2
+BOBOT_SYARAT = 0.1
+
+
+# Baris yang ditambah/diubah sejak indeks dibangun memakai vocab & idf lama; setelah perubahan
+# sebanyak REBUILD_RATIO dari ukuran indeks, indeks sebaiknya dibangun ulang penuh
+REBUILD_RATIO = 0.05
+
+
+def _kodekan(series):
+    nilai = series.fillna('').astype(str).str.strip().str.lower()
+    codes, labels = pd.factorize(nilai)
+    return codes.astype(np.int32), {label: i for i, label in enumerate(labels)}
+
+
+def _kodekan_tambahan(series, labels):
+    labels = dict(labels)
+    nilai = series.fillna('').astype(str).str.strip().str.lower()
+    codes = np.array([labels.setdefault(v, len(labels)) for v in nilai], dtype=np.int32)
+    return codes, labels
+
+
+def _teks_dokumen(df):
+    return (df['nama_lembaga'].fillna('').astype(str) + ' '
+            + df['top_univ'].fillna('').astype(str) + ' '
+            + df['program_beasiswa'].fillna('').astype(str) + ' '
+            + df['persyaratan'].fillna('').astype(str) + ' '
+            + df['benefit'].fillna('').astype(str))
+
+
+class MatchingIndex:
+    def __init__(self, df):
+        self._lock = threading.Lock()  # dipegang singkat saat array ditukar / dibaca score()
+        self._tulis = threading.Lock()  # menserialkan upsert/remove: baca-hitung-tukar dalam satu giliran
+        self.ids = df['id'].astype(str).to_numpy()
+        self.fitur = df[FITUR_KOLOM].to_numpy(dtype=np.float32, na_value=np.nan)
+        self.jenjang = _jenjang_mask(df['program_beasiswa'].fillna('') + ' ' + df['jenis_beasiswa'].fillna(''))
+        self.negara, self.negara_labels = _kodekan(df['asal_beasiswa'])
+        self.benua, self.benua_labels = _kodekan(df['benua'])
+        self.tfidf, self.vocab, self.idf = _build_tfidf(_teks_dokumen(df).tolist())
+        self.aktif = np.ones(len(self.ids), dtype=bool)
+        # Kolom id tidak unik di tabel beasiswa, jadi satu id bisa menunjuk beberapa baris
+        self._posisi = {}
+        for i, id_value in enumerate(self.ids):
+            self._posisi.setdefault(id_value, []).append(i)
+        self.perubahan = 0
+
+    def __len__(self):
+        return int(self.aktif.sum())
+
+    @property
+    def perlu_rebuild(self):
+        return self.perubahan > REBUILD_RATIO * max(len(self.ids), 1)
+
+    def _tfidf_baris(self, texts):
+        # Baris baru dihitung dengan vocab & idf yang sudah ada. Token baru tidak bisa dicari sampai
+        # rebuild, tetapi tetap ikut norma (dengan idf token langka) agar skor tidak membengkak
+        idf_baru = np.log(1 + len(self.ids)) + 1
+        indptr = [0]
+        indices = []
+        data = []
+        norm = np.ones(len(texts), dtype=np.float32)
+        for i, teks in enumerate(texts):
+            kuadrat = 0.0
+            for token, jumlah in Counter(_tokenize(teks)).items():
+                idx = self.vocab.get(token)
+                bobot = (1 + np.log(jumlah)) * (self.idf[idx] if idx is not None else idf_baru)
+                kuadrat += bobot * bobot
+                if idx is not None:
+                    indices.append(idx)
+                    data.append(bobot)
+            indptr.append(len(indices))
+            if kuadrat:
+                norm[i] = np.sqrt(kuadrat)
+        baris = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(texts), self.tfidf.shape[1]),
+        )
+        return (sparse.diags(1 / norm) @ baris).tocsr().astype(np.float32)
+
+    def upsert(self, df):
+        # Baris lama ditandai tidak aktif lalu versi barunya ditambahkan di akhir (copy-on-write,
+        # sehingga score() yang sedang berjalan tetap memakai array lama yang konsisten)
+        if df.empty:
+            return
+        with self._tulis:
+            ids = df['id'].astype(str).to_numpy()
+            awal = len(self.ids)
+            negara, negara_labels = _kodekan_tambahan(df['asal_beasiswa'], self.negara_labels)
+            benua, benua_labels = _kodekan_tambahan(df['benua'], self.benua_labels)
+            baru = {
+                'ids': np.concatenate([self.ids, ids]),
+                'fitur': np.vstack([self.fitur, df[FITUR_KOLOM].to_numpy(dtype=np.float32, na_value=np.nan)]),
+                'jenjang': np.concatenate([self.jenjang, _jenjang_mask(df['program_beasiswa'].fillna('') + ' ' + df['jenis_beasiswa'].fillna(''))]),
+                'negara': np.concatenate([self.negara, negara]),
+                'benua': np.concatenate([self.benua, benua]),
+                'tfidf': sparse.vstack([self.tfidf, self._tfidf_baris(_teks_dokumen(df).tolist())]).tocsr(),
+                'negara_labels': negara_labels,
+                'benua_labels': benua_labels,
+            }
+            aktif = np.concatenate([self.aktif, np.ones(len(ids), dtype=bool)])
+            posisi = dict(self._posisi)
+            for id_value in set(ids):
+                aktif[posisi.pop(id_value, [])] = False
+            for i, id_value in enumerate(ids, start=awal):
+                posisi.setdefault(id_value, []).append(i)
+            baru.update(aktif=aktif, _posisi=posisi)
+            self._tukar(baru, len(ids))
+
+    def remove(self, ids):
+        with self._tulis:
+            aktif = self.aktif.copy()
+            posisi = dict(self._posisi)
+            jumlah = 0
+            for id_value in ids:
+                lama = posisi.pop(str(id_value), [])
+                aktif[lama] = False
+                jumlah += len(lama)
+            self._tukar({'aktif': aktif, '_posisi': posisi}, jumlah)
+
+    def _tukar(self, baru, perubahan):
+        with self._lock:
+            for nama, nilai in baru.items():
+                setattr(self, nama, nilai)
+            self.perubahan += perubahan
+
+    def _query_vector(self, teks):
+        q = np.zeros(len(self.vocab), dtype=np.float32)
+        for token, jumlah in Counter(_tokenize(teks)).items():
+            idx = self.vocab.get(token)
+            if idx is not None:
+                q[idx] = (1 + np.log(jumlah)) * self.idf[idx]
+        norm = np.linalg.norm(q)
+        return q / norm if norm else None
+
+    def _cocok_kategori(self, codes, labels, nilai):
+        if not nilai:
+            return None
+        nilai = [labels[v.strip().lower()] for v in nilai if v.strip().lower() in labels]
+        return np.isin(codes, nilai)
+
+    def score(self, profil, top_k=10, hanya_memenuhi=True):
+        # profil: dict dengan kunci jenjang, negara, benua (list), ipk, ielts, toefl, usia, minat
+        with self._lock:
+            ids, fitur, jenjang_mask, tfidf, aktif = self.ids, self.fitur, self.jenjang, self.tfidf, self.aktif
+            kategori = ((self.negara, self.negara_labels, 'negara', BOBOT_NEGARA),
+                        (self.benua, self.benua_labels, 'benua', BOBOT_BENUA))
+        n = len(ids)
+        if n == 0:
+            return pd.DataFrame(columns=['id', 'skor', 'memenuhi_syarat'])
+
+        skor = np.zeros(n, dtype=np.float32)
+        q = self._query_vector(profil.get('minat') or '')
+        if q is not None:
+            skor += BOBOT_TEKS * (tfidf @ q)
+
+        jenjang = profil.get('jenjang')
+        if jenjang:
+            bit = _BIT_JENJANG[jenjang]
+            skor += BOBOT_JENJANG * ((jenjang_mask & bit) != 0)
+
+        for codes, labels, kunci, bobot in kategori:
+            cocok = self._cocok_kategori(codes, labels, profil.get(kunci))
+            if cocok is not None:
+                skor += bobot * cocok
+
+        # Syarat minimum: nilai profil harus >= syarat; usia harus <= batas
+        memenuhi = np.ones(n, dtype=bool)
+        for i, (kolom, kunci) in enumerate(zip(FITUR_KOLOM, ['ipk', 'ielts', 'toefl', 'usia'])):
+            nilai = profil.get(kunci)
+            if nilai is None:
+                continue
+            syarat = fitur[:, i]
+            ada = ~np.isnan(syarat)
+            if kolom == 'max_usia':
+                lolos = syarat >= nilai
+            else:
+                lolos = syarat <= nilai
+            memenuhi &= ~ada | lolos
+            skor += BOBOT_SYARAT * (ada & lolos)
+
+        # Baris yang sudah dihapus/diganti tidak pernah ikut hasil
+        if hanya_memenuhi:
+            kandidat = np.flatnonzero(memenuhi & aktif)
+        else:
+            kandidat = np.flatnonzero(aktif)
+        if len(kandidat) == 0:
+            return pd.DataFrame(columns=['id', 'skor', 'memenuhi_syarat'])
+
+        k = min(top_k, len(kandidat))
+        skor_kandidat = skor[kandidat]
+        teratas = np.argpartition(-skor_kandidat, k - 1)[:k]
+        teratas = teratas[np.argsort(-skor_kandidat[teratas], kind='stable')]
+        hasil = kandidat[teratas]
+        return pd.DataFrame({
+            'id': ids[hasil],
+            'skor': skor[hasil],
+            'memenuhi_syarat': memenuhi[hasil],
+        })
+
+
+def _matching_frame(conn, simpan_fitur=True, ids=None):
+    if simpan_fitur:
+        ensure_feature_table(conn)
+    # Koneksi baca-saja (snapshot replika) tidak bisa membuang fitur lama, jadi fitur lama diabaikan saja
+    kedaluwarsa = not simpan_fitur and _fitur_kedaluwarsa(conn)
+    sumber_fitur = "(SELECT NULL AS id, NULL AS min_ipk, NULL AS min_ielts, NULL AS min_toefl, NULL AS max_usia)" if kedaluwarsa else "beasiswa_fitur"
+    query = f"""
+        SELECT b.id, b.benua, b.asal_beasiswa, b.nama_lembaga, b.top_univ,
+               b.program_beasiswa, b.jenis_beasiswa, b.persyaratan, b.benefit,
+               f.id AS fitur_id, f.min_ipk, f.min_ielts, f.min_toefl, f.max_usia
+        FROM beasiswa b
+        LEFT JOIN {sumber_fitur} f ON f.id = b.id
+    """
+    if ids is None:
+        df = pd.read_sql_query(query, conn)
+    else:
+        ids = [str(x) for x in ids]
+        df = pd.concat([
+            pd.read_sql_query(query + f" WHERE b.id IN ({','.join('?' * len(ids[i:i + 500]))})", conn, params=ids[i:i + 500])
+            for i in range(0, len(ids), 500)
+        ] or [pd.read_sql_query(query + " WHERE 0", conn)], ignore_index=True)
+
+    # Data lama yang belum punya fitur diekstrak sekali lalu disimpan
+    kosong = df['fitur_id'].isna()
+    if kosong.any():
+        fitur = [extract_requirements(p, b) for p, b in zip(df.loc[kosong, 'persyaratan'], df.loc[kosong, 'benefit'])]
+        df.loc[kosong, FITUR_KOLOM] = pd.DataFrame(fitur, index=df.index[kosong], columns=FITUR_KOLOM, dtype=float)
+        if simpan_fitur:
+            save_requirements(conn, df.loc[kosong, ['id', 'persyaratan', 'benefit']].itertuples(index=False, name=None))
+            conn.commit()
+    return df
+
+
+def build_matching_index(conn, simpan_fitur=True):
+    return MatchingIndex(_matching_frame(conn, simpan_fitur))
+
+
+def update_matching_index(index, conn, ids_baru=(), ids_hapus=()):
+    # Perubahan per baris diterapkan langsung ke indeks yang sudah ada, tanpa membangun ulang TF-IDF
+    if ids_hapus:
+        index.remove(ids_hapus)
+    if ids_baru:
+        index.upsert(_matching_frame(conn, ids=ids_baru))
+    return index
+
+
+class MatchingIndexCache:
+    # Satu indeks per versi data. peek() tidak pernah membangun indeks, sehingga fungsi tulis
+    # tidak ikut menanggung build penuh saat belum ada indeks di memori.
+    # Saat versi berganti (snapshot baru di replika reader), indeks lama tetap dilayani
+    # sementara indeks versi baru dibangun di thread latar
+    def __init__(self, build):
+        self._build = build
+        self._lock = threading.Lock()
+        self._versi = None
+        self._index = None
+        self._generasi = 0  # dinaikkan clear(); build yang dimulai sebelum clear() tidak dipasang
+        self._membangun = None  # thread build latar yang sedang berjalan
+
+    def get(self, versi):
+        with self._lock:
+            if self._index is not None:
+                if self._versi != versi and self._membangun is None:
+                    self._membangun = threading.Thread(target=self._build_latar, args=(versi, self._generasi), daemon=True)
+                    self._membangun.start()
+                return self._index
+            generasi = self._generasi
+        # Belum ada indeks sama sekali (proses baru atau setelah clear()): dibangun langsung
+        index = self._build(versi)
+        self._pasang(index, versi, generasi)
+        return index
+
+    def _build_latar(self, versi, generasi):
+        try:
+            self._pasang(self._build(versi), versi, generasi)
+        finally:
+            with self._lock:
+                self._membangun = None
+
+    def _pasang(self, index, versi, generasi):
+        with self._lock:
+            if generasi == self._generasi:
+                self._index, self._versi = index, versi
+
+    def wait(self):
+        # Menunggu build latar yang sedang berjalan selesai
+        thread = self._membangun
+        if thread is not None:
+            thread.join()
+
+    def peek(self, versi):
+        with self._lock:
+            return self._index if self._versi == versi else None
+
+    def clear(self):
+        with self._lock:
+            self._index = self._versi = None
+            self._generasi += 1
@@ -0,0 +1,137 @@
+import argparse
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+from backup import copy_database
+
+# -------------------------
+# Konfigurasi database (lewat environment variable)
+# -------------------------
+DB_PATH = os.environ.get("BEASISWA_DB", "beasiswa.db")
+DB_ROLE = os.environ.get("BEASISWA_ROLE", "writer").strip().lower()  # writer / reader
+SNAPSHOT_DIR = os.environ.get("BEASISWA_SNAPSHOT_DIR") or None
+SNAPSHOT_KEEP = int(os.environ.get("BEASISWA_SNAPSHOT_KEEP", "5"))
+MMAP_SIZE = int(os.environ.get("BEASISWA_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+if DB_ROLE not in ("writer", "reader"):
+    raise ValueError(f"BEASISWA_ROLE harus 'writer' atau 'reader', bukan '{DB_ROLE}'")
+if DB_ROLE == "reader" and not SNAPSHOT_DIR:
+    raise ValueError("BEASISWA_SNAPSHOT_DIR wajib diisi untuk replika reader")
+
+CURRENT_FILE = "CURRENT"
+_SNAPSHOT_NAME = re.compile(r'^beasiswa-(\d+)\.db$')
+# Menserialkan penerbitan dalam satu proses: versi, file CURRENT, dan pruning dihitung bergiliran
+_publish_lock = threading.Lock()
+
+
+# -------------------------
+# Membaca snapshot (replika reader)
+# -------------------------
+def current_snapshot(snapshot_dir):
+    # Nama snapshot terbaru ditulis di file CURRENT yang diganti secara atomik
+    try:
+        with open(os.path.join(snapshot_dir, CURRENT_FILE)) as f:
+            nama = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(snapshot_dir, nama) if nama else None
+
+
+def open_snapshot(path, mmap_size=MMAP_SIZE):
+    # immutable=1: SQLite tidak memakai lock/journal sama sekali, aman untuk file yang tidak pernah berubah
+    uri = f"file:{quote(os.path.abspath(path))}?mode=ro&immutable=1"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+    return conn
+
+
+# -------------------------
+# Menerbitkan snapshot (node writer)
+# -------------------------
+def _list_snapshots(snapshot_dir):
+    versi = []
+    for nama in os.listdir(snapshot_dir):
+        match = _SNAPSHOT_NAME.match(nama)
+        if match:
+            versi.append((int(match.group(1)), nama))
+    return sorted(versi)
+
+
+def _replace_atomic(tmp_path, final_path):
+    with open(tmp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, final_path)
+
+
+def publish_snapshot(conn, snapshot_dir, keep=SNAPSHOT_KEEP):
+    os.makedirs(snapshot_dir, exist_ok=True)
+    with _publish_lock:
+        return _publish(conn, snapshot_dir, keep)
+
+
+def _publish(conn, snapshot_dir, keep):
+    snapshots = _list_snapshots(snapshot_dir)
+    versi = max(int(time.time() * 1000), snapshots[-1][0] + 1 if snapshots else 0)
+    nama = f"beasiswa-{versi}.db"
+    final_path = os.path.join(snapshot_dir, nama)
+    # File sementara bernama unik agar penerbit lain (mis. CLI batch) tidak menimpa file yang sama
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{nama}.", suffix=".tmp", dir=snapshot_dir)
+    os.close(fd)  # file kosong adalah database SQLite yang valid untuk tujuan copy_database
+
+    mulai = time.perf_counter()
+    try:
+        copy_database(conn, tmp_path)
+        dest = sqlite3.connect(tmp_path)
+        try:
+            # Snapshot harus berdiri sendiri tanpa file -wal/-shm agar bisa dibuka immutable
+            dest.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            dest.close()
+        os.chmod(tmp_path, 0o444)
+        _replace_atomic(tmp_path, final_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    fd, pointer_tmp = tempfile.mkstemp(prefix=f".{CURRENT_FILE}.", suffix=".tmp", dir=snapshot_dir)
+    with os.fdopen(fd, 'w') as f:
+        f.write(nama)
+    _replace_atomic(pointer_tmp, os.path.join(snapshot_dir, CURRENT_FILE))
+
+    # Replika yang masih membuka snapshot lama tetap bisa membaca file yang sudah di-unlink
+    for _, lama in _list_snapshots(snapshot_dir)[:-keep]:
+        os.remove(os.path.join(snapshot_dir, lama))
+
+    return {
+        'path': final_path,
+        'version': versi,
+        'size': os.path.getsize(final_path),
+        'duration': time.perf_counter() - mulai,
+    }
+
+
+# -------------------------
+# Mode batch (CLI)
+# -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Terbitkan snapshot read-only database beasiswa")
+    parser.add_argument("--db", default=DB_PATH, help="Path database SQLite sumber")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR, required=SNAPSHOT_DIR is None)
+    parser.add_argument("--keep", type=int, default=SNAPSHOT_KEEP, help="Jumlah snapshot yang disimpan")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        info = publish_snapshot(conn, args.snapshot_dir, args.keep)
+    finally:
+        conn.close()
+    print(f"Snapshot {info['path']} ({info['size'] / 1024:.1f} KB) diterbitkan dalam {info['duration']:.2f} detik")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import sqlite3
+import pytest
+from backup import create_backup, list_table_snapshots, restore_backup, restore_table_snapshot, swap_reset
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "beasiswa.db")
+    conn.execute("CREATE TABLE beasiswa (id TEXT, nama_lembaga TEXT)")
+    conn.execute("CREATE INDEX idx_beasiswa_nama ON beasiswa (nama_lembaga)")
+    conn.execute("CREATE TABLE link_status (link TEXT PRIMARY KEY, ok INTEGER)")
+    conn.executemany("INSERT INTO beasiswa VALUES (?, ?)", [(f"B{i}", f"Lembaga {i}") for i in range(10)])
+    conn.execute("INSERT INTO link_status VALUES ('https://example.org', 1)")
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _ids(conn):
+    return sorted(row[0] for row in conn.execute("SELECT id FROM beasiswa"))
+
+
+def test_backup_excludes_table_snapshots(conn, tmp_path):
+    swap_reset(conn)
+    info = create_backup(conn, tmp_path / "backups", keep=None)
+    backup = sqlite3.connect(tmp_path / "backups" / info['name'])
+    tables = {row[0] for row in backup.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    backup.close()
+    assert tables == {"beasiswa", "link_status"}
+
+
+def test_restore_backup_keeps_table_snapshots(conn, tmp_path):
+    backup_dir = tmp_path / "backups"
+    info = create_backup(conn, backup_dir, keep=None)
+
+    # Reset setelah backup: data lama tersimpan sebagai snapshot tabel
+    reset = swap_reset(conn)
+    conn.executemany("INSERT INTO beasiswa VALUES (?, ?)", [("X1", "Baru"), ("X2", "Baru")])
+    conn.execute("DELETE FROM link_status")
+    conn.commit()
+
+    restore_backup(conn, info['name'], backup_dir)
+    assert _ids(conn) == sorted(f"B{i}" for i in range(10))
+    assert conn.execute("SELECT count(*) FROM link_status").fetchone()[0] == 1
+    assert conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'idx_beasiswa_nama'").fetchone()
+    assert [s['name'] for s in list_table_snapshots(conn)] == [reset['name']]
+
+    # Snapshot tabel masih bisa dipulihkan setelah restore file
+    restore_table_snapshot(conn, reset['name'])
+    assert _ids(conn) == sorted(f"B{i}" for i in range(10))
+
+
+def test_restore_backup_missing(conn, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        restore_backup(conn, "beasiswa-20240101-000000-000000.db", tmp_path)
+
+
+def test_table_snapshot_reports_size(conn):
+    awal = swap_reset(conn)
+    conn.executemany("INSERT INTO beasiswa VALUES (?, ?)", [(f"X{i}", "Lembaga " * 100) for i in range(200)])
+    conn.commit()
+    besar = swap_reset(conn)
+    ukuran = {s['name']: s['size'] for s in list_table_snapshots(conn)}
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    assert ukuran[awal['name']] >= page_size
+    assert ukuran[besar['name']] > 200 * len("Lembaga " * 100)
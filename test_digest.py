@@ -0,0 +1,117 @@
+import sqlite3
+import threading
+from datetime import date
+from email import message_from_bytes, policy
+import pandas as pd
+import pytest
+from digest import LocalSmtpServer, SmtpSender, add_subscriber, compute_digest, filter_digest, parse_deadlines, send_digest
+
+HARI_INI = date(2025, 3, 10)
+
+
+# -------------------------
+# Parsing waktu pendaftaran
+# -------------------------
+@pytest.mark.parametrize("waktu, deadline", [
+    ("Januari - April", date(2025, 4, 30)),
+    ("1-15 April", date(2025, 4, 15)),
+    ("10 Maret 2025 - 30 Oktober 2025", date(2025, 10, 30)),
+    ("10 Maret 2026", date(2026, 3, 10)),
+    ("Sep", date(2025, 9, 30)),
+    ("1 - 31 Februari 2025", date(2025, 2, 28)),
+    # Bulan yang sudah lewat tanpa tahun berarti periode tahun depan
+    ("Oktober - Februari", date(2026, 2, 28)),
+])
+def test_parse_deadlines(waktu, deadline):
+    assert parse_deadlines(pd.Series([waktu]), HARI_INI)[0].date() == deadline
+
+
+@pytest.mark.parametrize("waktu", ["Sepanjang tahun", "-", "", None, "2025"])
+def test_parse_deadlines_unknown(waktu):
+    assert pd.isna(parse_deadlines(pd.Series([waktu]), HARI_INI)[0])
+
+
+def _beasiswa():
+    return pd.DataFrame([
+        ("B1", "MEXT", "S2 Master", "Asia", "Jepang", "1-20 Maret", "https://example.org/mext"),
+        ("B2", "DAAD", "S3 Doktor", "Eropa", "Jerman", "Januari - April", None),
+        ("B3", "Chevening", "S2 Master", "Eropa", "Inggris", "April - Mei", None),
+        ("B4", "Fulbright", "S2 Master", "Amerika", "Amerika Serikat", "1-5 Maret", None),
+        ("B5", "LPDP", "S2 Master", "Asia", "Indonesia", "Sepanjang tahun", None),
+    ], columns=['id', 'nama_lembaga', 'program_beasiswa', 'benua', 'asal_beasiswa', 'waktu_pendaftaran', 'link'])
+
+
+def test_compute_digest_window():
+    digest = compute_digest(_beasiswa(), HARI_INI)
+    # B3 ditutup Mei (di luar jendela), B4 sudah lewat, B5 tanpa deadline
+    assert list(digest['id']) == ["B1", "B2"]
+    assert list(digest['deadline']) == [date(2025, 3, 20), date(2025, 4, 30)]
+
+
+def test_filter_digest_per_subscriber():
+    digest = compute_digest(_beasiswa(), HARI_INI)
+    assert list(filter_digest(digest, ["asia"])['id']) == ["B1"]
+    assert list(filter_digest(digest, program=["S3 Doktor"])['id']) == ["B2"]
+    assert list(filter_digest(digest, ["Eropa"], ["S2 Master"])['id']) == []
+    assert list(filter_digest(digest)['id']) == ["B1", "B2"]
+
+
+# -------------------------
+# Pengiriman lewat server SMTP lokal
+# -------------------------
+@pytest.fixture
+def smtp():
+    server = LocalSmtpServer("127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    add_subscriber(conn, "semua@example.org", "Semua")
+    add_subscriber(conn, "asia@example.org", "Asia", benua=["Asia"])
+    add_subscriber(conn, "doktor@example.org", "Doktor", program=["S3 Doktor"])
+    add_subscriber(conn, "amerika@example.org", "Amerika", benua=["Amerika"])
+    yield conn
+    conn.close()
+
+
+def _penerima(server):
+    return sorted(to for m in server.messages for to in m['to'])
+
+
+def test_send_digest_per_subscriber(smtp, conn):
+    digest = compute_digest(_beasiswa(), HARI_INI)
+    sender = SmtpSender("127.0.0.1", smtp.server_address[1])
+    terkirim = send_digest(conn, digest, sender, "noreply@example.org", HARI_INI)
+
+    # Pelanggan Amerika tidak punya beasiswa yang akan ditutup, jadi tidak dikirimi
+    assert terkirim == 3
+    assert _penerima(smtp) == ["<asia@example.org>", "<doktor@example.org>", "<semua@example.org>"]
+    pesan = {m['to'][0]: message_from_bytes(m['data'], policy=policy.default) for m in smtp.messages}
+    teks = pesan["<asia@example.org>"].get_body(('plain',)).get_content()
+    assert "MEXT" in teks and "DAAD" not in teks
+    assert pesan["<semua@example.org>"]['Subject'].startswith("[Portal Beasiswa] 2 beasiswa")
+
+
+def test_send_digest_once_per_day(smtp, conn):
+    digest = compute_digest(_beasiswa(), HARI_INI)
+    sender = SmtpSender("127.0.0.1", smtp.server_address[1])
+    assert send_digest(conn, digest, sender, "noreply@example.org", HARI_INI) == 3
+
+    # Kiriman kedua di hari yang sama dilewati (tercatat di digest_log)
+    assert send_digest(conn, digest, sender, "noreply@example.org", HARI_INI) == 0
+    assert len(smtp.messages) == 3
+    assert conn.execute("SELECT count(*) FROM digest_log WHERE tanggal = ?", (HARI_INI.isoformat(),)).fetchone()[0] == 3
+
+    # Pelanggan baru di hari yang sama tetap dikirimi
+    add_subscriber(conn, "baru@example.org")
+    assert send_digest(conn, digest, sender, "noreply@example.org", HARI_INI) == 1
+
+    assert send_digest(conn, digest, sender, "noreply@example.org", HARI_INI, force=True) == 4
+    assert send_digest(conn, digest, sender, "noreply@example.org", date(2025, 3, 11)) == 4
+    assert len(smtp.messages) == 3 + 1 + 4 + 4
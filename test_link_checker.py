@@ -0,0 +1,125 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from link_checker import check_links, refresh_link_status, link_status_map
+
+
+# -------------------------
+# Server HTTP lokal sebagai tiruan situs beasiswa
+# -------------------------
+class _MockHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _kirim(self, status, headers=None):
+        self.send_response(status)
+        for kunci, nilai in (headers or {}).items():
+            self.send_header(kunci, nilai)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _handle(self):
+        if self.path == "/ok":
+            self._kirim(200)
+        elif self.path == "/no-head":
+            self._kirim(405 if self.command == "HEAD" else 200)
+        elif self.path == "/redirect":
+            self._kirim(301, {"Location": "/redirect-2"})
+        elif self.path == "/redirect-2":
+            self._kirim(302, {"Location": "/ok"})
+        elif self.path == "/loop":
+            self._kirim(302, {"Location": "/loop"})
+        elif self.path == "/slow":
+            time.sleep(2)
+            self._kirim(200)
+        else:
+            self._kirim(404)
+
+    do_HEAD = _handle
+    do_GET = _handle
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _MockHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _cek(urls, **kwargs):
+    kwargs.setdefault("host_interval", 0)
+    return {r['link']: r for r in asyncio.run(check_links(urls, **kwargs))}
+
+
+def test_head_ok(server):
+    hasil = _cek([f"{server}/ok"])[f"{server}/ok"]
+    assert hasil['ok'] == 1
+    assert hasil['status_code'] == 200
+    assert hasil['method'] == "HEAD"
+    assert hasil['redirects'] == 0
+
+
+def test_head_fallback_to_get(server):
+    hasil = _cek([f"{server}/no-head"])[f"{server}/no-head"]
+    assert hasil['ok'] == 1
+    assert hasil['status_code'] == 200
+    assert hasil['method'] == "GET"
+
+
+def test_redirects_counted(server):
+    hasil = _cek([f"{server}/redirect"])[f"{server}/redirect"]
+    assert hasil['ok'] == 1
+    assert hasil['redirects'] == 2
+    assert hasil['final_url'] == f"{server}/ok"
+
+
+def test_redirect_loop(server):
+    hasil = _cek([f"{server}/loop"])[f"{server}/loop"]
+    assert hasil['ok'] == 0
+    assert hasil['status_code'] is None
+    assert hasil['error'] == "Terlalu banyak redirect"
+
+
+def test_broken_link(server):
+    hasil = _cek([f"{server}/missing"])[f"{server}/missing"]
+    assert hasil['ok'] == 0
+    assert hasil['status_code'] == 404
+    assert hasil['method'] == "GET"
+
+
+def test_timeout(server):
+    hasil = _cek([f"{server}/slow"], timeout=0.3)[f"{server}/slow"]
+    assert hasil['ok'] == 0
+    assert hasil['error'] == "Timeout"
+
+
+@pytest.mark.parametrize("url", ["ftp://example.org/beasiswa", "bukan url", "https://"])
+def test_invalid_url(url):
+    hasil = _cek([url])[url]
+    assert hasil['ok'] == 0
+    assert hasil['error'] == "URL tidak valid"
+
+
+def test_refresh_link_status_caches_results(server):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE beasiswa (id TEXT, link TEXT)")
+    conn.executemany("INSERT INTO beasiswa VALUES (?, ?)", [
+        ("B1", f" {server}/ok "), ("B2", f"{server}/missing"), ("B3", "-"), ("B4", None),
+    ])
+    hasil = refresh_link_status(conn, host_interval=0)
+    assert sorted(r['link'] for r in hasil) == [f"{server}/missing", f"{server}/ok"]
+
+    status = link_status_map(conn)
+    assert status[f"{server}/ok"][0] == 1
+    assert status[f"{server}/missing"][:2] == (0, 404)
+
+    # Hasil yang masih baru tidak dicek ulang kecuali dipaksa
+    assert refresh_link_status(conn, host_interval=0) == []
+    assert len(refresh_link_status(conn, force=True, host_interval=0)) == 2
@@ -0,0 +1,170 @@
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from matching import FITUR_KOLOM, MatchingIndex, MatchingIndexCache, build_matching_index, extract_requirements
+
+
+def _frame(ids):
+    n = len(ids)
+    return pd.DataFrame({
+        'id': ids,
+        'benua': ['Asia', 'Eropa'] * (n // 2) + ['Asia'] * (n % 2),
+        'asal_beasiswa': 'Jepang',
+        'nama_lembaga': [f"Lembaga {x}" for x in ids],
+        'top_univ': 'University of Tokyo',
+        'program_beasiswa': 'S2 Master',
+        'jenis_beasiswa': 'Fully Funded',
+        'persyaratan': 'IPK minimal 3.0',
+        'benefit': 'Beasiswa penuh',
+        'min_ipk': 3.0, 'min_ielts': np.nan, 'min_toefl': np.nan, 'max_usia': np.nan,
+    })[['id', 'benua', 'asal_beasiswa', 'nama_lembaga', 'top_univ', 'program_beasiswa',
+        'jenis_beasiswa', 'persyaratan', 'benefit'] + FITUR_KOLOM]
+
+
+# -------------------------
+# Ekstraksi persyaratan
+# -------------------------
+@pytest.mark.parametrize("teks, usia", [
+    ("Usia 18-35 tahun", 35),
+    ("Usia minimal 18 tahun dan maksimal 35 tahun", 35),
+    ("berusia antara 20 hingga 40 tahun", 40),
+    ("Berusia 20 s.d. 30 tahun pada saat mendaftar", 30),
+    ("Usia maks. 35 tahun", 35),
+    ("usia tidak lebih dari 40 tahun", 40),
+    ("Applicants aged between 21 and 45", 45),
+    ("Usia di bawah 30 tahun", 30),
+    ("Berumur 35 tahun saat pendaftaran", 35),
+    ("Maksimal 35 tahun untuk S2", 35),
+    ("Usia minimal 18 tahun", None),
+    ("IPK minimal 3.0, tanpa batas usia", None),
+])
+def test_extract_max_usia(teks, usia):
+    assert extract_requirements(teks)['max_usia'] == usia
+
+
+def test_extract_scores():
+    fitur = extract_requirements("IPK minimal 3,25; IELTS 6.5 atau TOEFL PBT 550", "Usia 18-35 tahun")
+    assert fitur['min_ipk'] == 3.25
+    assert fitur['min_ielts'] == 6.5
+    assert fitur['min_toefl'] == 80
+    assert fitur['max_usia'] == 35
+
+
+# -------------------------
+# Pembaruan indeks inkremental
+# -------------------------
+def test_upsert_and_remove():
+    index = MatchingIndex(_frame([f"B{i}" for i in range(10)]))
+    index.upsert(_frame(["B3", "BARU"]))
+    index.remove(["B5"])
+    assert len(index) == 10
+    hasil = index.score({'minat': 'beasiswa penuh'}, top_k=100, hanya_memenuhi=False)
+    assert sorted(hasil['id']) == sorted([f"B{i}" for i in range(10) if i != 5] + ["BARU"])
+
+
+def test_concurrent_upserts_keep_arrays_aligned():
+    index = MatchingIndex(_frame([f"B{i}" for i in range(170)]))
+    mulai = threading.Barrier(8)
+    galat = []
+
+    def tulis(t):
+        mulai.wait()
+        try:
+            for i in range(25):
+                index.upsert(_frame([f"T{t}-{i}", f"B{(t * 25 + i) % 170}"]))
+                index.score({'minat': 'tokyo'}, top_k=5)
+            index.remove([f"T{t}-0"])
+        except Exception as e:
+            galat.append(e)
+
+    threads = [threading.Thread(target=tulis, args=(t,)) for t in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not galat
+    assert len(index.ids) == len(index.aktif) == index.tfidf.shape[0] == len(index.fitur)
+    # 170 baris awal (yang di-upsert tetap satu versi aktif) + 8 x 24 baris baru yang tersisa
+    assert len(index) == 170 + 8 * 24
+    hasil = index.score({'minat': 'tokyo'}, top_k=1000, hanya_memenuhi=False)
+    assert hasil['id'].is_unique
+    assert len(hasil) == len(index)
+
+
+def test_stale_features_reextracted(tmp_path):
+    conn = sqlite3.connect(tmp_path / "beasiswa.db")
+    conn.execute("CREATE TABLE beasiswa (id TEXT, benua TEXT, asal_beasiswa TEXT, nama_lembaga TEXT, top_univ TEXT, "
+                 "program_beasiswa TEXT, jenis_beasiswa TEXT, persyaratan TEXT, benefit TEXT)")
+    conn.execute("INSERT INTO beasiswa VALUES ('B1', 'Asia', 'Jepang', 'MEXT', '', 'S2', 'Fully Funded', 'Usia 18-35 tahun', '')")
+    # Fitur tersimpan dari ekstraktor lama (batas bawah rentang terbaca sebagai batas usia)
+    conn.execute("CREATE TABLE beasiswa_fitur (id TEXT PRIMARY KEY, min_ipk REAL, min_ielts REAL, min_toefl REAL, max_usia REAL)")
+    conn.execute("INSERT INTO beasiswa_fitur VALUES ('B1', NULL, NULL, NULL, 18)")
+    conn.commit()
+
+    # Koneksi baca-saja mengekstrak ulang di memori tanpa menulis
+    conn_ro = sqlite3.connect(f"file:{tmp_path / 'beasiswa.db'}?mode=ro", uri=True)
+    assert build_matching_index(conn_ro, simpan_fitur=False).fitur[0, FITUR_KOLOM.index('max_usia')] == 35
+    conn_ro.close()
+
+    assert build_matching_index(conn).fitur[0, FITUR_KOLOM.index('max_usia')] == 35
+    assert conn.execute("SELECT max_usia FROM beasiswa_fitur WHERE id = 'B1'").fetchone()[0] == 35
+    conn.close()
+
+
+# -------------------------
+# Cache indeks per versi data
+# -------------------------
+def test_index_cache_peek_never_builds():
+    dibangun = []
+    cache = MatchingIndexCache(lambda versi: dibangun.append(versi) or MatchingIndex(_frame(["B1", "B2"])))
+    assert cache.peek(None) is None
+    assert not dibangun
+
+    index = cache.get(None)
+    assert cache.get(None) is index and cache.peek(None) is index
+    assert cache.peek("snapshot-baru") is None
+    assert dibangun == [None]
+
+    cache.clear()
+    assert cache.peek(None) is None
+
+
+def test_index_cache_clear_discards_running_build():
+    mulai, lanjut = threading.Event(), threading.Event()
+
+    def build(versi):
+        mulai.set()
+        lanjut.wait()
+        return MatchingIndex(_frame(["B1"]))
+
+    cache = MatchingIndexCache(build)
+    thread = threading.Thread(target=cache.get, args=(None,))
+    thread.start()
+    mulai.wait()
+    # Penulisan selama build berjalan: hasil build bisa belum memuat perubahan itu
+    cache.clear()
+    lanjut.set()
+    thread.join()
+    assert cache.peek(None) is None
+
+
+def test_index_cache_serves_previous_version_while_building():
+    lanjut = threading.Event()
+
+    def build(versi):
+        if versi == "snapshot-2":
+            lanjut.wait()
+        return MatchingIndex(_frame(["B1"] if versi == "snapshot-1" else ["B1", "B2"]))
+
+    cache = MatchingIndexCache(build)
+    lama = cache.get("snapshot-1")
+    # Snapshot baru terbit: indeks lama dilayani tanpa menunggu build
+    assert cache.get("snapshot-2") is lama
+    assert cache.get("snapshot-2") is lama
+    lanjut.set()
+    cache.wait()
+    baru = cache.get("snapshot-2")
+    assert baru is not lama and len(baru) == 2
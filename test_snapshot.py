@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import threading
+import pytest
+import snapshot
+from snapshot import current_snapshot, open_snapshot, publish_snapshot
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "beasiswa.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE beasiswa (id TEXT, nama_lembaga TEXT)")
+    conn.executemany("INSERT INTO beasiswa VALUES (?, ?)", [(f"B{i}", f"Lembaga {i}") for i in range(10)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _isi(path):
+    conn = open_snapshot(path)
+    try:
+        return conn.execute("SELECT count(*) FROM beasiswa").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_publish_snapshot(db_path, tmp_path):
+    conn = sqlite3.connect(db_path)
+    info = publish_snapshot(conn, tmp_path / "snapshots")
+    conn.close()
+    assert current_snapshot(tmp_path / "snapshots") == info['path']
+    assert _isi(info['path']) == 10
+    assert not [nama for nama in os.listdir(tmp_path / "snapshots") if nama.endswith(".tmp")]
+
+
+def test_concurrent_publish_in_same_millisecond(db_path, tmp_path, monkeypatch):
+    # Jam dibekukan: semua penerbitan mendapat timestamp milidetik yang sama
+    monkeypatch.setattr(snapshot.time, "time", lambda: 1700000000.0)
+    snapshot_dir = tmp_path / "snapshots"
+    mulai = threading.Barrier(6)
+    hasil, galat = [], []
+
+    def terbitkan():
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        mulai.wait()
+        try:
+            hasil.append(publish_snapshot(conn, snapshot_dir, keep=10))
+        except Exception as e:
+            galat.append(e)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=terbitkan) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not galat
+    assert len({info['version'] for info in hasil}) == 6
+    assert current_snapshot(snapshot_dir) == max(hasil, key=lambda info: info['version'])['path']
+    assert all(_isi(info['path']) == 10 for info in hasil)
+    assert not [nama for nama in os.listdir(snapshot_dir) if nama.endswith(".tmp")]
@@ -0,0 +1,144 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+import pandas as pd
+
+# -------------------------
+# Indeks prefix untuk autocomplete
+# -------------------------
+TYPEAHEAD_COLUMNS = ['nama_lembaga', 'top_univ', 'asal_beasiswa']
+SUGGEST_LIMIT = 5
+# Prefix pendek mencakup banyak nilai, jadi hasil teratasnya disimpan dan diperbarui saat menulis
+SHORT_PREFIX = 2
+SHORT_PREFIX_LIMIT = 10
+
+
+def _normalize(value):
+    if value is None or pd.isna(value):
+        return None
+    value = " ".join(str(value).split())
+    return value if value and value != '-' else None
+
+
+def _word_keys(value):
+    # Setiap awal kata ikut diindeks: "tok" menemukan "University of Tokyo"
+    kata = value.lower().split()
+    return {" ".join(kata[i:]) for i in range(len(kata))}
+
+
+class PrefixIndex:
+    def __init__(self, counts=None):
+        self._lock = threading.Lock()
+        self.counts = Counter()
+        self._keys = []  # list terurut berisi (kunci_lowercase, nilai_asli)
+        self._memo = {}
+        # Pembangunan awal: kumpulkan semua kunci lalu urutkan sekali
+        for value, n in (counts or {}).items():
+            value = _normalize(value)
+            if value is not None and n > 0:
+                self.counts[value] += n
+        self._keys = sorted((key, value) for value in self.counts for key in _word_keys(value))
+
+        kelompok = {}
+        for key, value in self._keys:
+            for prefix in self._short_prefixes(key):
+                kelompok.setdefault(prefix, set()).add(value)
+        self._short = {prefix: self._rank(values, SHORT_PREFIX_LIMIT) for prefix, values in kelompok.items()}
+
+    @staticmethod
+    def _short_prefixes(key):
+        return {key[:i] for i in range(1, min(SHORT_PREFIX, len(key)) + 1)}
+
+    def _rank(self, values, limit):
+        # Nilai yang paling sering dipakai didahulukan, lalu alfabetis
+        return heapq.nsmallest(limit, values, key=lambda v: (-self.counts[v], v.lower()))
+
+    def _scan(self, prefix):
+        lo = bisect_left(self._keys, (prefix,))
+        hi = bisect_left(self._keys, (prefix + "\uffff",))
+        return {value for _, value in self._keys[lo:hi]}
+
+    def _refresh_short(self, value, removed):
+        for key in _word_keys(value):
+            for prefix in self._short_prefixes(key):
+                teratas = self._short.get(prefix, [])
+                if removed and value in teratas:
+                    # Nilai keluar dari daftar teratas: hitung ulang dari indeks
+                    self._short[prefix] = self._rank(self._scan(prefix), SHORT_PREFIX_LIMIT)
+                elif not removed:
+                    self._short[prefix] = self._rank(set(teratas) | {value}, SHORT_PREFIX_LIMIT)
+
+    def add(self, value, n=1):
+        value = _normalize(value)
+        if value is None:
+            return
+        with self._lock:
+            if self.counts[value] <= 0:
+                for key in _word_keys(value):
+                    insort(self._keys, (key, value))
+            self.counts[value] += n
+            self._refresh_short(value, removed=False)
+            self._memo.clear()
+
+    def remove(self, value, n=1):
+        value = _normalize(value)
+        if value is None:
+            return
+        with self._lock:
+            if self.counts[value] <= 0:
+                return
+            self.counts[value] -= n
+            if self.counts[value] <= 0:
+                del self.counts[value]
+                for key in _word_keys(value):
+                    i = bisect_left(self._keys, (key, value))
+                    if i < len(self._keys) and self._keys[i] == (key, value):
+                        del self._keys[i]
+            self._refresh_short(value, removed=True)
+            self._memo.clear()
+
+    def suggest(self, prefix, limit=SUGGEST_LIMIT):
+        prefix = " ".join(str(prefix).lower().split())
+        if not prefix:
+            return []
+        memo_key = (prefix, limit)
+        hasil = self._memo.get(memo_key)
+        if hasil is not None:
+            return hasil
+        with self._lock:
+            if len(prefix) <= SHORT_PREFIX and limit <= SHORT_PREFIX_LIMIT:
+                hasil = self._short.get(prefix, [])[:limit]
+            else:
+                hasil = self._rank(self._scan(prefix), limit)
+            self._memo[memo_key] = hasil
+        return hasil
+
+
+class TypeaheadIndex:
+    def __init__(self, columns=TYPEAHEAD_COLUMNS):
+        self.indexes = {kolom: PrefixIndex() for kolom in columns}
+
+    def suggest(self, kolom, prefix, limit=SUGGEST_LIMIT):
+        return self.indexes[kolom].suggest(prefix, limit)
+
+    def add_row(self, row):
+        # row: dict kolom -> nilai
+        for kolom, index in self.indexes.items():
+            index.add(row.get(kolom))
+
+    def remove_row(self, row):
+        for kolom, index in self.indexes.items():
+            index.remove(row.get(kolom))
+
+
+def build_typeahead_index(conn, columns=TYPEAHEAD_COLUMNS):
+    index = TypeaheadIndex(columns)
+    for kolom in columns:
+        counts = {}
+        for value, n in conn.execute(f"SELECT {kolom}, count(*) FROM beasiswa GROUP BY {kolom}"):
+            value = _normalize(value)
+            if value is not None:
+                counts[value] = counts.get(value, 0) + n
+        index.indexes[kolom] = PrefixIndex(counts)
+    return index